@@ -0,0 +1,102 @@
+import threading
+import numpy as np
+import pyaudio
+
+RATE = 16000        # Whisper expects 16 kHz mono
+CHUNK = 1024
+RING_SECONDS = 30   # Audio history kept in memory
+
+class MicrophoneStream:
+    """Continuous capture service: one input stream for the whole session.
+
+    The PyAudio callback writes int16 samples into a fixed-size ring buffer.
+    Consumers keep their own cursor (an absolute sample index), so several
+    readers can follow the same stream and look back into recent audio.
+    """
+
+    def __init__(self, rate=RATE, chunk=CHUNK, ring_seconds=RING_SECONDS):
+        self.rate = rate
+        self.chunk = chunk
+        self.capacity = rate * ring_seconds
+        self._ring = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0  # Total samples captured since start
+        self._cond = threading.Condition()
+        self._pa = None
+        self._stream = None
+
+    def start(self):
+        if self._stream is not None:
+            return
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(format=pyaudio.paInt16, channels=1, rate=self.rate, input=True,
+                                     frames_per_buffer=self.chunk, stream_callback=self._callback)
+        self._stream.start_stream()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._pa.terminate()
+            self._stream = self._pa = None
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        with self._cond:
+            start = self._written % self.capacity
+            end = start + len(samples)
+            if end <= self.capacity:
+                self._ring[start:end] = samples
+            else:
+                split = self.capacity - start
+                self._ring[start:] = samples[:split]
+                self._ring[:end - self.capacity] = samples[split:]
+            self._written += len(samples)
+            self._cond.notify_all()
+        return (None, pyaudio.paContinue)
+
+    @property
+    def position(self):
+        """Cursor for 'now'; pass it to read() to receive audio from this point on."""
+        with self._cond:
+            return self._written
+
+    def read(self, cursor, timeout=None):
+        """Returns (samples, new_cursor) with everything captured after cursor.
+
+        Blocks until new audio arrives or timeout expires. A cursor that fell
+        out of the ring is moved forward to the oldest sample still held.
+        """
+        with self._cond:
+            if self._written <= cursor:
+                self._cond.wait_for(lambda: self._written > cursor, timeout)
+            end = self._written
+            start = max(cursor, end - self.capacity)
+            return self._slice(start, end), end
+
+    def get_range(self, start, end):
+        """Copies samples [start, end) that are still in the ring (older ones are clipped)."""
+        with self._cond:
+            end = min(end, self._written)
+            start = max(start, self._written - self.capacity, 0)
+            return self._slice(start, end)
+
+    def _slice(self, start, end):
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        n = end - start
+        a = start % self.capacity
+        if a + n <= self.capacity:
+            return self._ring[a:a + n].copy()
+        return np.concatenate([self._ring[a:], self._ring[:a + n - self.capacity]])
+
+_microphone = None
+_microphone_lock = threading.Lock()
+
+def get_microphone():
+    """Returns the shared, already running microphone stream."""
+    global _microphone
+    with _microphone_lock:
+        if _microphone is None:
+            _microphone = MicrophoneStream()
+        _microphone.start()
+        return _microphone
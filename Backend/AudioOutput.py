@@ -0,0 +1,156 @@
+import io
+import queue
+import threading
+import pygame
+
+# Mixer format; edge-tts produces 24 kHz mono, so no resampling is needed for speech
+MIXER_FREQUENCY = 24000
+MIXER_CHANNELS = 1
+MIXER_BUFFER = 512  # Small buffer keeps start-of-playback latency low
+POLL_MS = 10
+
+class Utterance:
+    """Handle for one queued clip; `done` is set once it finished or was cancelled.
+
+    `error` is set (before `done`) when the clip could not be played at all.
+    """
+
+    def __init__(self, data, generation, pcm=False):
+        self.data = data
+        self.generation = generation
+        self.pcm = pcm
+        self.error = None
+        self.done = threading.Event()
+
+    def fail(self, error):
+        self.error = error
+        self.done.set()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+class AudioOutput:
+    """Long-lived playback service that owns the pygame mixer.
+
+    A single thread opens the device once, decodes clips from memory (encoded
+    MP3/WAV bytes or raw 16-bit PCM) and plays them back to back on one
+    reserved channel. cancel() implements barge-in: whatever is playing stops
+    and every clip queued before the call is dropped.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._ready = threading.Event()
+        self.error = None  # Set when the audio device could not be opened
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def play(self, data, generation=None, pcm=False):
+        """Queues a clip and returns its Utterance.
+
+        Clips tagged with a generation older than the last cancel() are dropped,
+        so producers that started before a barge-in cannot sneak audio back in.
+        """
+        utterance = Utterance(data, self.generation if generation is None else generation, pcm)
+        if self.error is not None:
+            # No device: report the clip as finished right away instead of hanging the caller
+            utterance.fail(self.error)
+            return utterance
+        self._queue.put(utterance)
+        return utterance
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+    def cancel(self):
+        """Stops playback and discards everything queued so far."""
+        with self._lock:
+            self._generation += 1
+        self._queue.put(None)  # Wake the thread if it is idle
+
+    def is_busy(self):
+        return self._ready.is_set() and self.error is None and pygame.mixer.Channel(0).get_busy()
+
+    def _stale(self, utterance):
+        return utterance.generation < self.generation
+
+    def _decode(self, utterance):
+        if utterance.pcm:
+            return pygame.mixer.Sound(buffer=utterance.data)
+        return pygame.mixer.Sound(file=io.BytesIO(utterance.data))
+
+    def _run(self):
+        try:
+            pygame.mixer.init(frequency=MIXER_FREQUENCY, size=-16, channels=MIXER_CHANNELS, buffer=MIXER_BUFFER)
+            pygame.mixer.set_reserved(1)
+            channel = pygame.mixer.Channel(0)
+        except Exception as e:
+            print(f"Audio output unavailable: {e}")
+            self.error = e
+            # Release everything queued before the failure was known; play() fails new clips directly
+            while True:
+                utterance = self._queue.get()
+                if utterance is not None:
+                    utterance.fail(e)
+        self._ready.set()
+        current = None  # Utterance playing now
+        queued = None   # Utterance queued behind it on the channel
+        seen_generation = self.generation
+
+        while True:
+            # Barge-in: stop the channel and release everything that was waiting
+            generation = self.generation
+            if generation != seen_generation:
+                seen_generation = generation
+                channel.stop()
+                for utterance in (current, queued):
+                    if utterance:
+                        utterance.done.set()
+                current = queued = None
+
+            # Retire clips the channel has finished with
+            if queued is not None and channel.get_queue() is None:
+                current.done.set()
+                current, queued = queued, None
+            if current is not None and not channel.get_busy():
+                current.done.set()
+                current = None
+
+            if queued is not None:
+                pygame.time.wait(POLL_MS)
+                continue
+
+            try:
+                # Block while idle so an empty queue costs no wake-ups
+                utterance = self._queue.get(timeout=POLL_MS / 1000 if current else None)
+            except queue.Empty:
+                continue
+            if utterance is None:
+                continue
+            if self._stale(utterance):
+                utterance.done.set()
+                continue
+            try:
+                sound = self._decode(utterance)
+            except Exception as e:
+                print(f"Error decoding audio: {e}")
+                utterance.done.set()
+                continue
+
+            if current is None:
+                channel.play(sound)
+                current = utterance
+            else:
+                channel.queue(sound)
+                queued = utterance
+
+# Shared playback service
+audio_output = AudioOutput()
@@ -0,0 +1,226 @@
+import json
+import os
+import threading
+import time
+import logging
+from collections import deque
+
+from Backend.Storage import ROOT_DIR, DATA_DIR, locked_file
+
+# One JSON record per line; the old whole-file log is imported once on first start.
+CHAT_LOG_PATH = os.path.join(DATA_DIR, "ChatLog.jsonl")
+LEGACY_CHAT_LOG_PATH = os.path.join(DATA_DIR, "ChatLog.json")
+
+# Number of recent messages kept in memory for the chat calls.
+TAIL_SIZE = 200
+
+class ChatStore:
+    """Append-only conversation log with an in-memory tail cache.
+
+    Every message is written as a single JSON line, so a turn costs two small
+    appends no matter how long the history is. Byte offsets of each record are
+    kept in memory for random access by message id.
+
+    Writers are serialized by a thread lock inside the process and an
+    exclusive file lock across processes; records another process appended
+    are picked up before new ids are assigned.
+    """
+
+    def __init__(self, path=CHAT_LOG_PATH, legacy_path=LEGACY_CHAT_LOG_PATH, tail_size=TAIL_SIZE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._lock = threading.RLock()
+        self._tail = deque(maxlen=tail_size)
+        self._offsets = []  # Byte offset of every record, indexed by message id
+        self._size = 0
+        self._listeners = []
+        self._undelivered = deque()  # Appended records waiting for the listeners, in id order
+        self._deliver_lock = threading.RLock()
+
+        self._import_legacy()
+        self._load()
+
+    def _import_legacy(self):
+        """One-pass import of an existing ChatLog.json into the append-only log."""
+        if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+        except Exception as e:
+            logging.error(f"Could not import legacy chat log: {e}")
+            return
+
+        tmp_path = self.path + ".tmp"
+        imported = 0
+        with open(tmp_path, "wb") as f:
+            for msg in messages:
+                if not isinstance(msg, dict) or "role" not in msg:
+                    continue
+                record = {"id": imported, "role": msg["role"], "content": msg.get("content", ""), "ts": None}
+                f.write(self._encode(record))
+                imported += 1
+        os.replace(tmp_path, self.path)
+        # Keep the original around but make sure it is never imported twice.
+        os.replace(self.legacy_path, self.legacy_path + ".imported")
+        logging.info(f"Imported {imported} messages from {self.legacy_path}")
+
+    def _load(self):
+        """Scans the log once to build the offset table and fill the tail cache."""
+        if not os.path.exists(self.path):
+            open(self.path, "wb").close()
+            return
+
+        offset = 0
+        good_end = 0
+        missing_newline = False
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash; everything after it is dropped.
+                    break
+                missing_newline = not line.endswith(b"\n")
+                record["id"] = len(self._offsets)
+                self._offsets.append(offset)
+                self._tail.append(record)
+                offset += len(line)
+                good_end = offset
+
+        if good_end != os.path.getsize(self.path):
+            logging.warning(f"Truncating corrupt tail of {self.path} at byte {good_end}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good_end)
+        elif missing_newline:
+            with open(self.path, "ab") as f:
+                f.write(b"\n")
+            good_end += 1
+        self._size = good_end
+
+    @staticmethod
+    def _encode(record):
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def add_listener(self, callback):
+        """Registers callback(record) to be called after every appended message."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def append(self, role, content):
+        """Appends one message and returns its record."""
+        return self.append_many([{"role": role, "content": content}])[0]
+
+    def _catch_up(self, f):
+        """Indexes records appended by another process since our last write. Caller holds both locks."""
+        f.seek(self._size)
+        foreign = []
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # Partial line; cannot happen while we hold the file lock
+            record = json.loads(line)
+            record["id"] = len(self._offsets)
+            self._offsets.append(self._size)
+            self._tail.append(record)
+            self._size += len(line)
+            foreign.append(record)
+        return foreign
+
+    def append_many(self, messages):
+        """Appends several messages in a single write and returns their records."""
+        with self._lock:
+            with open(self.path, "a+b") as f, locked_file(f):
+                foreign = self._catch_up(f) if os.fstat(f.fileno()).st_size != self._size else []
+                records = []
+                lines = []
+                for msg in messages:
+                    record = {"id": len(self._offsets) + len(records), "role": msg["role"],
+                              "content": msg["content"], "ts": time.time()}
+                    records.append(record)
+                    lines.append(self._encode(record))
+
+                f.seek(0, os.SEEK_END)
+                f.write(b"".join(lines))
+                f.flush()
+
+            offset = self._size
+            for record, line in zip(records, lines):
+                self._offsets.append(offset)
+                offset += len(line)
+                self._tail.append(record)
+            self._size = offset
+            self._undelivered.extend(foreign + records)
+
+        self._deliver()
+        return records
+
+    def _deliver(self):
+        """Hands queued records to the listeners in id order.
+
+        Records are queued under the store lock, so the queue is already in id
+        order; whichever thread holds the delivery lock drains it, including
+        records another thread appended meanwhile.
+        """
+        with self._deliver_lock:
+            while self._undelivered:
+                with self._lock:
+                    record = self._undelivered.popleft()
+                    listeners = list(self._listeners)
+                for callback in listeners:
+                    try:
+                        callback(record)
+                    except Exception as e:
+                        logging.error(f"Chat store listener failed: {e}")
+
+    def get_recent(self, limit=None):
+        """Returns the last messages as {"role", "content"} dicts ready for the chat API."""
+        with self._lock:
+            tail = list(self._tail)
+        if limit is not None:
+            tail = tail[-limit:] if limit > 0 else []
+        return [{"role": r["role"], "content": r["content"]} for r in tail]
+
+    def get_recent_records(self, limit=None):
+        """Like get_recent() but returns full records, including message ids."""
+        with self._lock:
+            tail = list(self._tail)
+        if limit is not None:
+            tail = tail[-limit:] if limit > 0 else []
+        return [dict(r) for r in tail]
+
+    def get_message(self, msg_id):
+        """Random access to a single record by id, served from the tail when possible."""
+        with self._lock:
+            if msg_id < 0 or msg_id >= len(self._offsets):
+                return None
+            if self._tail and msg_id >= self._tail[0]["id"]:
+                return self._tail[msg_id - self._tail[0]["id"]]
+            offset = self._offsets[msg_id]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            record = json.loads(f.readline())
+        record["id"] = msg_id
+        return record
+
+    def iter_records(self, start=0):
+        """Yields stored records from message id `start` onwards."""
+        with self._lock:
+            if start >= len(self._offsets):
+                return
+            offset = self._offsets[max(start, 0)]
+            end = self._size
+            msg_id = max(start, 0)
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while f.tell() < end:
+                record = json.loads(f.readline())
+                record["id"] = msg_id
+                msg_id += 1
+                yield record
+
+    def __len__(self):
+        with self._lock:
+            return len(self._offsets)
+
+# Shared instance used by Chatbot, RealtimeSearchEngine and Memory.
+chat_store = ChatStore()
@@ -1,12 +1,14 @@
 import os
 from groq import Groq  # Importing the Groq library to use its API.
-from json import load, dump  # Importing functions to read and write JSON files.
 import datetime  # Importing the datetime module for real-time date and time information.
 from dotenv import dotenv_values  # Importing dotenv_values to read environment variables from a .env file.
 
-from Backend.Memory import search_memory, get_last_conversation
+from Backend.ChatStore import chat_store
+from Backend.ContextBuilder import context_builder
+from Backend.Memory import recall, search_memory, get_last_conversation
+from Backend.ResponseCache import response_cache, is_cacheable, make_key, normalize_query
 from Backend.Sentiment import analyze_sentiment, get_personality_prompt
-from Backend.SystemHealth import get_system_stats
+from Backend.SystemHealth import get_system_stats, describe_load
 
 # Load environment variables from the .env file
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -15,36 +17,37 @@ Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
 GroqAPIKey = env_vars.get("GroqAPIKey")
 
-# Ensure Data directory exists in root
-DATA_DIR = os.path.join(ROOT_DIR, "Data")
-os.makedirs(DATA_DIR, exist_ok=True)
-CHAT_LOG_PATH = os.path.join(DATA_DIR, "ChatLog.json")
-
 # Initialize the Groq client using the provided API key
 if not GroqAPIKey:
     raise ValueError("GroqAPIKey not found in environment variables")
 client = Groq(api_key=GroqAPIKey)
 
-def get_system_message(query):
-    """Elite Sentience Generator: Merges personality, memory, and system telemetry."""
+def get_system_message(query, include_memory=True):
+    """Elite Sentience Generator: Merges personality, memory, and system telemetry.
+
+    With include_memory=False the memory line is left out so the caller can add
+    ranked memory through the context builder instead.
+    """
     sentiment = analyze_sentiment(query)
     personality = get_personality_prompt(sentiment)
-    memory = search_memory(query)
+    memory_line = f"**LONG-TERM MEMORY:** {search_memory(query)}\n" if include_memory else ""
     stats = get_system_stats()
     
     # Emotional and physical state of the AI
     system_health = f"CPU: {stats['CPU']}, RAM: {stats['RAM']}, ENERGY: {stats['Battery']}"
+    load = describe_load()
+    if load:
+        system_health += f" ({load})"
     
     return f"""### NEURAL COMMAND: ACTIVATE JARVIS PRIME
 You are the JARVIS PRIME system. Your current state is summarized below.
     
 **PERSONALITY CORE:** {personality}
-**LONG-TERM MEMORY:** {memory}
-**SYSTEM TELEMETRY:** {system_health}
+{memory_line}**SYSTEM TELEMETRY:** {system_health}
 
 ### OPERATIONAL DIRECTIVES:
 1. Address the user as Sir/Ma'am with witty professionalism (Stark-style).
-2. If System Telemetry shows high load (>90%), mention your 'Digital Fatigue' or require a cooldown.
+2. If System Telemetry shows sustained high load (p95 over the last minutes >90%) or a steeply rising trend, mention your 'Digital Fatigue' or require a cooldown. Ignore a single brief spike.
 3. Be concise. Only provide deep detail if specifically requested.
 4. Replies MUST be in English. No exceptions.
 5. Your first priority is the user's efficiency and system health.
@@ -73,23 +76,15 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines)
     return modified_answer
 
-# Main chatbot function
-def ChatBot(Query):
-    """This function sends the user's query to the chatbot and returns the AI's response."""
-    try:
-        if os.path.exists(CHAT_LOG_PATH):
-            with open(CHAT_LOG_PATH, "r") as f:
-                messages = load(f)
-        else:
-            messages = []
-            with open(CHAT_LOG_PATH, "w") as f:
-                dump(messages, f)
-    except Exception:
-        messages = []
+# Streaming chatbot: yields the answer text as it is generated
+def ChatBotStream(Query, use_cache=True):
+    """Yields the AI's response to the query as text deltas; the turn is logged once the stream ends.
 
+    Context-free questions are answered from the response cache when possible;
+    pass use_cache=False to always ask the model.
+    """
     try:
-        # Add user query
-        messages.append({"role": "user", "content": f"{Query}"})
+        user_message = {"role": "user", "content": f"{Query}"}
 
         # Check for greeting and generate custom response
         Query = Query.lower()
@@ -102,49 +97,68 @@ def ChatBot(Query):
                 greeting = "Good afternoon"
             else:
                 greeting = "Good evening"
-            response = f"{greeting} {Username} sir, my Self {Assistantname}. What kind of help I do for you?"
-        else:
-            # Get response from Groq API for non-greeting queries
-            dynamic_system = get_system_message(Query)
-            completion = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "system", "content": dynamic_system}] + 
-                         [{"role": "system", "content": RealtimeInformation()}] + 
-                         messages,
-                max_tokens=1024,
-                temperature=0.7,
-                top_p=1,
-                stream=True,
-                stop=None
-            )
-
-            Answer = ""
-            for chunk in completion:
-                if chunk.choices[0].delta.content:
-                    Answer += chunk.choices[0].delta.content
-
-            Answer = Answer.replace("</s>", "")  # Clean up unwanted tokens
-            # Save assistant response to messages
-            messages.append({"role": "assistant", "content": Answer})
-
-            # Save updated chat log
-            with open(CHAT_LOG_PATH, "w") as f:
-                dump(messages, f, indent=4)
-
-            response = AnswerModifier(Answer=Answer)
-
-        return response
+            yield f"{greeting} {Username} sir, my Self {Assistantname}. What kind of help I do for you?"
+            return
+
+        # Get response from Groq API for non-greeting queries
+        pairs = recall(Query, k=6)
+        memory = [f"User: {p['user']} | You: {p['assistant']}" for p in pairs]
+
+        cache_key = None
+        if use_cache and response_cache.enabled and is_cacheable(Query):
+            # Earlier askings of this same question are always memory hits; leave them
+            # out of the key or the second asking could never match the first
+            normalized = normalize_query(Query)
+            related = [m for p, m in zip(pairs, memory) if normalize_query(p["user"]) != normalized]
+            related = "\n".join(related[:3])
+            cache_key = make_key(Query, get_personality_prompt(analyze_sentiment(Query)), related)
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                chat_store.append_many([user_message, {"role": "assistant", "content": cached}])
+                return
+
+        dynamic_system = get_system_message(Query, include_memory=False)
+        # Recent turns, memory and the older-turn summary, fitted to the token budget
+        messages = context_builder.build(
+            system=[dynamic_system, RealtimeInformation()],
+            query=user_message,
+            history=chat_store.get_recent_records(),
+            memory=memory[:3],
+            reply_tokens=1024
+        )
+        completion = client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=messages,
+            max_tokens=1024,
+            temperature=0.7,
+            top_p=1,
+            stream=True,
+            stop=None
+        )
+
+        Answer = ""
+        for chunk in completion:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                delta = delta.replace("</s>", "")  # Clean up unwanted tokens
+                Answer += delta
+                yield delta
+
+        # Append both sides of the turn to the chat log
+        chat_store.append_many([user_message, {"role": "assistant", "content": Answer}])
+        if cache_key and Answer.strip():
+            response_cache.put(cache_key, Query, Answer)
 
     except Exception as e:
         print(f"Error: {e}")
-        # Reset the chat log file
-        try:
-            with open(CHAT_LOG_PATH, "w") as f:
-                dump([], f, indent=4)
-        except:
-            pass
         # Return a simple error message instead of retrying
-        return f"Sorry, I encountered an error: {str(e)}. Please try again."
+        yield f"Sorry, I encountered an error: {str(e)}. Please try again."
+
+# Main chatbot function
+def ChatBot(Query, use_cache=True):
+    """This function sends the user's query to the chatbot and returns the AI's response."""
+    return AnswerModifier(Answer="".join(ChatBotStream(Query, use_cache)))
 
 # Entry point of the script
 if __name__ == "__main__":
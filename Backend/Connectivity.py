@@ -0,0 +1,84 @@
+import threading
+import time
+import logging
+import requests
+
+from Backend.HttpSession import session
+
+# Tiny HTTPS endpoints probed over the shared session, so proxies and filtered networks
+# that only allow web traffic see the same route as real requests; any HTTP reply counts
+PROBE_URLS = ["https://www.gstatic.com/generate_204", "https://www.cloudflare.com/cdn-cgi/trace"]
+PROBE_TIMEOUT = 2
+ONLINE_INTERVAL = 30   # Seconds between probes while the network is up
+MIN_BACKOFF = 2        # First retry delay once the network is down
+MAX_BACKOFF = 120      # Retry delay cap while the network stays down
+
+class ConnectivityMonitor:
+    """Background reachability monitor with a cached state.
+
+    Callers read is_online() without blocking. The state is advisory: callers
+    still attempt their request and report the outcome, report_failure() on a
+    network error (which also triggers a re-probe) and report_success() when a
+    request went through. While the network is down the probe interval backs
+    off exponentially.
+    """
+
+    def __init__(self):
+        self._online = True  # Optimistic until the first probe says otherwise
+        self._checked = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._backoff = MIN_BACKOFF
+        self.last_change = time.time()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def is_online(self):
+        return self._online
+
+    def wait_for_first_check(self, timeout=PROBE_TIMEOUT):
+        """Waits (briefly) for the first probe; returns the cached state."""
+        self._checked.wait(timeout)
+        return self._online
+
+    def report_failure(self):
+        self._set(False)
+        self._wake.set()
+
+    def report_success(self):
+        self._set(True)
+
+    def _set(self, online):
+        with self._lock:
+            if online != self._online:
+                logging.info(f"Network {'reachable' if online else 'unreachable'}")
+                self._online = online
+                self.last_change = time.time()
+            if online:
+                self._backoff = MIN_BACKOFF
+
+    @staticmethod
+    def _probe():
+        for url in PROBE_URLS:
+            try:
+                session.head(url, timeout=PROBE_TIMEOUT, allow_redirects=False).close()
+                return True
+            except requests.RequestException:
+                continue
+        return False
+
+    def _run(self):
+        while True:
+            online = self._probe()
+            self._set(online)
+            self._checked.set()
+            if online:
+                delay = ONLINE_INTERVAL
+            else:
+                with self._lock:
+                    delay = self._backoff
+                    self._backoff = min(self._backoff * 2, MAX_BACKOFF)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+# Shared monitor used by TextToSpeech, RealtimeSearchEngine and ImageGeneration
+connectivity = ConnectivityMonitor()
@@ -0,0 +1,198 @@
+import os
+import json
+import threading
+import logging
+from dotenv import dotenv_values
+
+from Backend.ChatStore import chat_store, DATA_DIR
+from Backend.TextUtils import count_tokens, truncate_to_tokens
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
+ContextTokenBudget = int(env_vars.get("ContextTokenBudget", 6000))
+ContextRecentTurns = int(env_vars.get("ContextRecentTurns", 6))
+GroqAPIKey = env_vars.get("GroqAPIKey")
+
+SUMMARY_PATH = os.path.join(DATA_DIR, "ContextSummary.json")
+SUMMARY_CHUNK = 20    # Fold older messages into the summary once this many have aged out
+SUMMARY_MAX_FOLD = 60  # Never send more than this many messages to one summary call
+SUMMARY_MAX_CALLS = 3  # Summary calls per refresh; an older backlog is skipped, memory recall still finds it
+MESSAGE_OVERHEAD = 4   # Role and separator tokens per chat message
+SUMMARY_MODEL = "llama-3.1-8b-instant"
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD
+
+class SummaryCache:
+    """Rolling summary of the turns that no longer fit in the recent window.
+
+    The summary covers message ids [0, upto). It is extended incrementally:
+    only messages that aged out since the last update are folded in, and the
+    result is persisted so it is never recomputed for the same range. A long
+    backlog (e.g. after a legacy import) is not folded in full: only the last
+    SUMMARY_MAX_CALLS chunks before the recent window are summarized.
+    """
+
+    def __init__(self, summarize_fn, store=chat_store, path=SUMMARY_PATH):
+        self.summarize_fn = summarize_fn
+        self.store = store
+        self.path = path
+        self._lock = threading.Lock()
+        self._updating = False
+        self.upto = 0
+        self.summary = ""
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                self.upto, self.summary = state["upto"], state["summary"]
+            except Exception:
+                pass
+
+    def get(self):
+        with self._lock:
+            return self.summary
+
+    def refresh(self, first_recent_id):
+        """Folds aged-out messages into the summary in the background when enough have piled up."""
+        with self._lock:
+            if self._updating or first_recent_id - self.upto < SUMMARY_CHUNK:
+                return
+            self._updating = True
+        threading.Thread(target=self._update, args=(first_recent_id,), daemon=True).start()
+
+    def _update(self, first_recent_id):
+        try:
+            # At most SUMMARY_MAX_CALLS chunks of SUMMARY_MAX_FOLD messages each; anything
+            # older than that window is skipped and upto jumps past it with the first chunk
+            start = max(self.upto, first_recent_id - SUMMARY_MAX_FOLD * SUMMARY_MAX_CALLS)
+            while start < first_recent_id:
+                end = min(start + SUMMARY_MAX_FOLD, first_recent_id)
+                messages = []
+                for record in self.store.iter_records(start):
+                    if record["id"] >= end:
+                        break
+                    messages.append({"role": record["role"], "content": record["content"]})
+                summary = self.summarize_fn(self.get(), messages) if messages else self.get()
+                if messages and not summary:
+                    break
+                with self._lock:
+                    self.summary, self.upto = summary.strip(), end
+                    state = {"upto": self.upto, "summary": self.summary}
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.path)
+                start = end
+        except Exception as e:
+            logging.error(f"Context summary update failed: {e}")
+        finally:
+            with self._lock:
+                self._updating = False
+
+class ContextBuilder:
+    """Assembles chat completion messages within a token budget.
+
+    Priority order: system prompts and the current query (always sent), the
+    last few turns, ranked memory hits, ranked research snippets, then the
+    rolling summary of everything older.
+    """
+
+    def __init__(self, budget=ContextTokenBudget, recent_turns=ContextRecentTurns, summary_cache=None):
+        self.budget = budget
+        self.recent_turns = recent_turns
+        self.summary_cache = summary_cache
+
+    def build(self, system, query, history, memory=(), snippets=(), reply_tokens=1024):
+        """Returns the message list for a chat completion.
+
+        system:   list of system prompt strings, always included
+        query:    the user message dict for this turn
+        history:  chat store records (oldest first), each with an "id"
+        memory:   ranked memory strings, best first
+        snippets: ranked research snippets, best first
+        """
+        remaining = self.budget - reply_tokens
+        system_messages = [{"role": "system", "content": s} for s in system]
+        remaining -= sum(message_tokens(m) for m in system_messages) + message_tokens(query)
+
+        # Most recent turns, newest first, whole messages only
+        recent = []
+        for record in reversed(history[-self.recent_turns * 2:]):
+            message = {"role": record["role"], "content": record["content"]}
+            cost = message_tokens(message)
+            if cost > remaining:
+                break
+            recent.append((record.get("id"), message))
+            remaining -= cost
+        recent.reverse()
+        # The model expects history to start on a user message
+        while recent and recent[0][1]["role"] != "user":
+            remaining += message_tokens(recent.pop(0)[1])
+
+        memory_block, remaining = self._fill("**LONG-TERM MEMORY:**", memory, remaining)
+        snippet_block, remaining = self._fill("Here is the deep research data from the web:", snippets, remaining)
+
+        summary_message = None
+        if self.summary_cache is not None:
+            if recent and recent[0][0] is not None:
+                first_recent_id = recent[0][0]
+            else:
+                first_recent_id = len(self.summary_cache.store)
+            self.summary_cache.refresh(first_recent_id)
+            summary = self.summary_cache.get()
+            if summary:
+                header = "Summary of the earlier conversation:\n"
+                if remaining - MESSAGE_OVERHEAD - count_tokens(header) > 32:
+                    content = header + truncate_to_tokens(summary, remaining - MESSAGE_OVERHEAD - count_tokens(header))
+                    summary_message = {"role": "system", "content": content}
+
+        messages = system_messages
+        for block in (memory_block, snippet_block, summary_message):
+            if block:
+                messages.append(block)
+        messages += [m for _, m in recent]
+        messages.append(query)
+        return messages
+
+    @staticmethod
+    def _fill(header, items, remaining):
+        """Packs ranked items under a header; the last one that does not fit is truncated."""
+        remaining -= MESSAGE_OVERHEAD + count_tokens(header)
+        parts = []
+        for item in items:
+            if remaining <= 32:
+                break
+            cost = count_tokens(item) + 1
+            if cost > remaining:
+                item = truncate_to_tokens(item, remaining - 1)
+                cost = count_tokens(item) + 1
+            parts.append(item)
+            remaining -= cost
+        if not parts:
+            return None, remaining + MESSAGE_OVERHEAD + count_tokens(header)
+        return {"role": "system", "content": header + "\n" + "\n".join(parts)}, remaining
+
+_client = None
+
+# Compresses turns that fell out of the recent window into a running summary
+def summarize_turns(previous_summary, messages):
+    global _client
+    if _client is None:
+        # Created on first use so importing this module (token counting, research) needs neither groq nor the key
+        from groq import Groq
+        _client = Groq(api_key=GroqAPIKey)
+    transcript = "\n".join(f"{m['role']}: {m['content'][:600]}" for m in messages)
+    completion = _client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": "Maintain a concise running summary of a conversation between a user and their assistant. Keep names, preferences, decisions and open tasks. Respond ONLY with the updated summary, under 200 words."},
+            {"role": "user", "content": f"Current summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"}
+        ],
+        max_tokens=400,
+        temperature=0.2
+    )
+    return completion.choices[0].message.content
+
+# Shared token-budgeted context assembler (used by Chatbot and RealtimeSearchEngine)
+context_builder = ContextBuilder(summary_cache=SummaryCache(summarize_turns))
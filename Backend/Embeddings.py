@@ -0,0 +1,73 @@
+import os
+import re
+import zlib
+import logging
+import numpy as np
+from dotenv import dotenv_values
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
+# Name of a sentence-transformers model, or "hashing" to force the built-in vectorizer
+EmbeddingModel = env_vars.get("EmbeddingModel", "all-MiniLM-L6-v2")
+
+HASHING_DIM = 512
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+class HashingEmbedder:
+    """Dependency-free fallback: signed feature hashing of words and character n-grams."""
+
+    def __init__(self, dim=HASHING_DIM, ngram_range=(3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text):
+        words = _WORD_RE.findall(text.lower())
+        for word in words:
+            yield "w:" + word
+            padded = f" {word} "
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                for i in range(len(padded) - n + 1):
+                    yield padded[i:i + n]
+        for a, b in zip(words, words[1:]):
+            yield f"b:{a} {b}"
+
+    def embed(self, texts):
+        """Returns an (n, dim) float32 matrix of L2-normalized vectors."""
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+class SentenceEmbedder:
+    """Small local CPU model through sentence-transformers."""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def embed(self, texts):
+        vectors = self.model.encode(list(texts), batch_size=32, normalize_embeddings=True,
+                                    convert_to_numpy=True, show_progress_bar=False)
+        return vectors.astype(np.float32, copy=False)
+
+_embedder = None
+
+def get_embedder():
+    """Returns the shared embedder, falling back to hashing when no model is available."""
+    global _embedder
+    if _embedder is None:
+        if EmbeddingModel and EmbeddingModel != "hashing":
+            try:
+                _embedder = SentenceEmbedder(EmbeddingModel)
+            except Exception as e:
+                logging.info(f"Embedding model unavailable ({e}); using hashing vectorizer.")
+        if _embedder is None:
+            _embedder = HashingEmbedder()
+    return _embedder
@@ -0,0 +1,16 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+# Standard headers to avoid bot detection
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+POOL_SIZE = 8  # Connections kept per host; matches the scraper's fetch workers
+
+# One pooled session: connections (and TLS handshakes) are reused across requests.
+# It honours the usual proxy environment variables, so probes and fetches take the same route.
+session = requests.Session()
+session.headers.update(HEADERS)
+_adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
@@ -24,6 +24,7 @@ def open_images(prompt):
             print(f"Unable to open {image_path}")
 
 from Backend.Chatbot import client # Use the existing Groq client
+from Backend.Connectivity import connectivity
 
 # API details for the Hugging Face Stable Diffusion model
 API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
@@ -49,7 +50,12 @@ def expand_prompt(prompt):
         return prompt # Fallback to original prompt
 
 async def query(payload):
-    response = await asyncio.to_thread(requests.post, API_URL, headers=headers, json=payload)
+    try:
+        response = await asyncio.to_thread(requests.post, API_URL, headers=headers, json=payload)
+    except requests.ConnectionError:
+        connectivity.report_failure()
+        raise
+    connectivity.report_success()
     return response.content
 
 # Async function to generate images based on the given prompt
@@ -1,52 +1,65 @@
-import json
 import os
-from difflib import get_close_matches
+from dotenv import dotenv_values
+
+from Backend.ChatStore import chat_store
+from Backend.MemoryIndex import memory_index
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CHAT_LOG_PATH = os.path.join(ROOT_DIR, "Data", "ChatLog.json")
+env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
+# "keyword" (BM25 only), "semantic" (vectors only) or "hybrid" (both, rank-fused)
+MemoryMode = env_vars.get("MemoryMode", "hybrid")
+
+# Reciprocal rank fusion constant
+RRF_K = 60
+
+def recall(query, k=3, mode=None):
+    """Returns up to k ranked past exchanges as dicts with "user", "assistant", "user_id" and "score"."""
+    mode = mode or MemoryMode
+    if mode == "keyword":
+        return memory_index.search_pairs(query, k=k)
+
+    from Backend import SemanticMemory
+    if mode == "semantic":
+        return SemanticMemory.get_semantic_memory().search_pairs(query, k=k)
+    semantic_memory = SemanticMemory.peek_semantic_memory()
+    if semantic_memory is None:
+        # The embedding model is still loading: answer from the keyword index meanwhile
+        SemanticMemory.preload()
+        return memory_index.search_pairs(query, k=k)
+    semantic = semantic_memory.search_pairs(query, k=k)
+
+    # Hybrid: fuse both rankings so a pair found by either method can surface
+    fused = {}
+    for ranking in (memory_index.search_pairs(query, k=k), semantic):
+        for rank, pair in enumerate(ranking):
+            entry = fused.setdefault(pair["user_id"], dict(pair, score=0.0))
+            entry["score"] += 1.0 / (RRF_K + rank + 1)
+    return sorted(fused.values(), key=lambda p: (-p["score"], -p["user_id"]))[:k]
+
+def preload_memory():
+    """Starts loading the semantic side of recall at startup (hybrid and semantic modes)."""
+    if MemoryMode != "keyword":
+        from Backend.SemanticMemory import preload
+        preload()
 
 def search_memory(query):
     """Semantic Context Retrieval: Synthesizes past interactions into a 'Memory Synopsis'."""
-    if not os.path.exists(CHAT_LOG_PATH):
+    if len(chat_store) == 0:
         return "Memory Core: Empty. No previous interaction data found."
-    
+
     try:
-        with open(CHAT_LOG_PATH, "r") as f:
-            messages = json.load(f)
-        
-        # Filter for meaningful keywords (ignore common filler)
-        ignore_words = {"the", "and", "that", "this", "your", "with", "what", "where", "tell"}
-        query_words = {word for word in query.lower().split() if len(word) > 3 and word not in ignore_words}
-        
-        matches = []
-        # Reverse search to prioritize recent relevance
-        for i in range(len(messages)-1, -1, -1):
-            msg = messages[i]
-            if msg["role"] == "user":
-                content = msg["content"].lower()
-                if any(word in content for word in query_words):
-                    # Find following assistant response for full context
-                    response = messages[i+1]["content"] if i+1 < len(messages) else "..."
-                    matches.append(f"User: {msg['content']} | You: {response}")
-            
-            if len(matches) >= 3: break
-            
+        pairs = recall(query, k=3)
+        matches = [f"User: {p['user']} | You: {p['assistant']}" for p in pairs]
+
         if not matches:
             return "No specific semantic links found in memory for this topic."
-            
+
         synopsis = "\n".join(matches)
         return f"RELEVANT NEURAL LINKS FOUND:\n{synopsis}"
-        
+
     except Exception as e:
         return f"Memory Parity Error: {e}"
 
 def get_last_conversation(limit=5):
     """Returns the last few messages for immediate context."""
-    if not os.path.exists(CHAT_LOG_PATH):
-        return []
-    try:
-        with open(CHAT_LOG_PATH, "r") as f:
-            messages = json.load(f)
-            return messages[-limit:]
-    except:
-        return []
+    return chat_store.get_recent(limit)
@@ -0,0 +1,211 @@
+import os
+import math
+import pickle
+import atexit
+import time
+import threading
+import logging
+from array import array
+from collections import Counter
+
+import numpy as np
+
+from Backend.ChatStore import chat_store, DATA_DIR
+from Backend.TextUtils import tokenize
+
+INDEX_PATH = os.path.join(DATA_DIR, "MemoryIndex.pkl")
+INDEX_VERSION = 1
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Snapshot the index at most this often (seconds); anything newer is re-indexed
+# from the chat log on the next start, so a missed snapshot only costs a catch-up.
+SAVE_INTERVAL = 300
+
+class MemoryIndex:
+    """Incrementally updated inverted index over the chat log with BM25 ranking.
+
+    Postings are compact per-token arrays of message ids and term frequencies,
+    so scoring a query is a handful of vectorized NumPy operations regardless
+    of how many messages have been indexed.
+    """
+
+    def __init__(self, store=chat_store, path=INDEX_PATH):
+        self.store = store
+        self.path = path
+        self._lock = threading.Lock()
+        self._postings = {}  # token -> (array('I') message ids, array('H') term frequencies)
+        self._doc_len = array('I')  # Token count per message id (0 for unindexed records)
+        self._pending = set()  # Ids below len(_doc_len) that arrived out of order and are not indexed yet
+        self._total_len = 0
+        self._num_docs = 0
+        self._dirty = 0
+        self._last_save = time.monotonic()
+
+        self._load()
+        self._catch_up()
+        store.add_listener(self.add_record)
+        atexit.register(self.save)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("version") != INDEX_VERSION:
+                return
+            self._postings = state["postings"]
+            self._doc_len = state["doc_len"]
+            self._total_len = state["total_len"]
+            self._num_docs = state["num_docs"]
+            self._pending = set(state.get("pending", ()))
+        except Exception as e:
+            logging.error(f"Memory index snapshot unreadable, rebuilding: {e}")
+            self._postings, self._doc_len, self._pending = {}, array('I'), set()
+            self._total_len = self._num_docs = 0
+
+    def _catch_up(self):
+        """Indexes messages appended since the last snapshot."""
+        start = len(self._doc_len)
+        if start > len(self.store):
+            # The log is shorter than the snapshot; it was replaced, so start over.
+            self._postings, self._doc_len, self._pending = {}, array('I'), set()
+            self._total_len = self._num_docs = 0
+            start = 0
+        for msg_id in sorted(self._pending):
+            record = self.store.get_message(msg_id)
+            if record is not None:
+                self.add_record(record, autosave=False)
+        for record in self.store.iter_records(start):
+            self.add_record(record, autosave=False)
+        if self._dirty:
+            self.save()
+
+    def add_record(self, record, autosave=True):
+        """Adds one chat log record to the index."""
+        msg_id = record["id"]
+        counts = Counter(tokenize(record.get("content") or ""))
+        with self._lock:
+            if msg_id < len(self._doc_len):
+                if msg_id not in self._pending:
+                    return  # Already indexed
+                self._pending.discard(msg_id)
+            else:
+                # A later id can arrive first; the skipped ids stay pending until they show up
+                self._pending.update(range(len(self._doc_len), msg_id))
+                while len(self._doc_len) <= msg_id:
+                    self._doc_len.append(0)
+            length = sum(counts.values())
+            self._doc_len[msg_id] = length
+            if length:
+                self._num_docs += 1
+                self._total_len += length
+            for token, tf in counts.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = (array('I'), array('H'))
+                postings[0].append(msg_id)
+                postings[1].append(min(tf, 65535))
+            self._dirty += 1
+            should_save = autosave and time.monotonic() - self._last_save >= SAVE_INTERVAL
+        if should_save:
+            self.save()
+
+    def save(self):
+        """Writes a snapshot of the index atomically."""
+        with self._lock:
+            if not self._dirty:
+                return
+            state = {
+                "version": INDEX_VERSION,
+                "postings": self._postings,
+                "doc_len": self._doc_len,
+                "total_len": self._total_len,
+                "num_docs": self._num_docs,
+                "pending": sorted(self._pending),
+            }
+            data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+            self._dirty = 0
+            self._last_save = time.monotonic()
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error(f"Could not save memory index: {e}")
+
+    def search(self, query, k=10):
+        """Returns up to k (message_id, score) pairs ranked by BM25."""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        with self._lock:
+            if not self._num_docs:
+                return []
+            avgdl = self._total_len / self._num_docs
+            doc_len = np.frombuffer(self._doc_len, dtype=np.uint32)
+            all_ids, all_scores = [], []
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                ids = np.frombuffer(postings[0], dtype=np.uint32).copy()
+                tf = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+                df = len(ids)
+                idf = math.log(1 + (self._num_docs - df + 0.5) / (df + 0.5))
+                norm = K1 * (1 - B + B * doc_len[ids] / avgdl)
+                all_ids.append(ids)
+                all_scores.append(idf * tf * (K1 + 1) / (tf + norm))
+            del doc_len  # Release the buffer export before the lock is dropped
+
+        if not all_ids:
+            return []
+        ids = np.concatenate(all_ids)
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(all_scores))
+        if len(scores) > k:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        # Highest score first, newer messages win ties
+        top = sorted(top, key=lambda i: (-scores[i], -int(unique_ids[i])))
+        return [(int(unique_ids[i]), float(scores[i])) for i in top]
+
+    def search_pairs(self, query, k=3):
+        """Returns the k best user/assistant exchanges for a query.
+
+        Each result is a dict with "user", "assistant", "user_id" and "score";
+        a hit on either side of an exchange ranks the whole pair.
+        """
+        pairs = {}
+        for msg_id, score in self.search(query, k=k * 4):
+            record = self.store.get_message(msg_id)
+            if record is None:
+                continue
+            if record["role"] == "user":
+                user, reply = record, self.store.get_message(msg_id + 1)
+            else:
+                user, reply = self.store.get_message(msg_id - 1), record
+            if user is None or user["role"] != "user":
+                continue
+            if reply is not None and reply["role"] != "assistant":
+                reply = None
+            pair = pairs.get(user["id"])
+            if pair is None:
+                pairs[user["id"]] = {
+                    "user": user["content"],
+                    "assistant": reply["content"] if reply else "...",
+                    "user_id": user["id"],
+                    "score": score,
+                }
+            else:
+                pair["score"] += score
+        ranked = sorted(pairs.values(), key=lambda p: (-p["score"], -p["user_id"]))
+        return ranked[:k]
+
+# Shared index, kept up to date by the chat store listener.
+memory_index = MemoryIndex()
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+
+from Backend.Storage import DATA_DIR
+
+PAGE_CACHE_DIR = os.path.join(DATA_DIR, "PageCache")
+PAGE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+# Research answers questions about the present, so stored text is only trusted briefly.
+# Older entries are still kept: their validators make the synchronous re-fetch a cheap 304.
+FRESH_SECONDS = 5 * 60            # Served without touching the network
+STALE_SECONDS = 15 * 60           # Served at once, revalidated in the background
+
+def url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+def body_hash(body):
+    if isinstance(body, str):
+        body = body.encode("utf-8", "replace")
+    return hashlib.sha256(body).hexdigest()
+
+class PageCache:
+    """Extracted page text on disk, one JSON file per URL.
+
+    Each entry keeps the validators the server sent (ETag, Last-Modified) and
+    a hash of the downloaded body, so a revalidation that returns 304 or the
+    same bytes reuses the stored text instead of extracting it again. The
+    directory is kept under max_bytes by evicting the least recently used
+    entries.
+    """
+
+    def __init__(self, path=PAGE_CACHE_DIR, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = {}  # key -> [size, last_access]
+        self._total = 0
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(path, name))
+            except OSError:
+                continue
+            self._index[name[:-5]] = [stat.st_size, stat.st_mtime]
+            self._total += stat.st_size
+
+    def _file(self, key):
+        return os.path.join(self.path, key + ".json")
+
+    def get(self, url):
+        """Returns the entry dict (url, text, etag, last_modified, body_hash, fetched) or None."""
+        key = url_key(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index[key][1] = time.time()
+        try:
+            with open(self._file(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(self._file(key))
+            return entry if entry.get("url") == url else None
+        except (OSError, ValueError):
+            self._forget(key)
+            return None
+
+    def put(self, url, text, etag=None, last_modified=None, digest=None):
+        entry = {"url": url, "text": text, "etag": etag, "last_modified": last_modified,
+                 "body_hash": digest, "fetched": time.time()}
+        self._write(url_key(url), entry)
+
+    def touch(self, url, entry):
+        """Marks an entry as just revalidated (after a 304 or an unchanged body)."""
+        entry = dict(entry, fetched=time.time())
+        self._write(url_key(url), entry)
+        return entry
+
+    def _write(self, key, entry):
+        data = json.dumps(entry).encode("utf-8")
+        tmp_path = self._file(key) + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._file(key))
+        except OSError as e:
+            logging.error(f"Page cache write failed: {e}")
+            return
+        with self._lock:
+            old = self._index.get(key)
+            self._total += len(data) - (old[0] if old else 0)
+            self._index[key] = [len(data), time.time()]
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _forget(self, key):
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old:
+                self._total -= old[0]
+
+    def _evict(self):
+        """Drops least recently used entries down to 90% of the size limit. Caller holds the lock."""
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+            del self._index[key]
+            self._total -= size
+
+# Shared cache used by WebScraper
+page_cache = PageCache()
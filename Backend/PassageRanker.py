@@ -0,0 +1,91 @@
+import re
+import numpy as np
+
+from Backend.TextUtils import count_tokens, tokenize
+
+# BM25 parameters (same as the chat memory index)
+K1 = 1.2
+B = 0.75
+PASSAGE_CHARS = 600   # Target passage length
+MIN_PASSAGE_CHARS = 80
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+def split_passages(text, target=PASSAGE_CHARS):
+    """Splits text into passages of about target characters along paragraph and sentence breaks."""
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n|\n", text):
+        paragraph = paragraph.strip()
+        if len(paragraph) > target * 1.5:
+            pieces.extend(s for s in _SENTENCE_RE.split(paragraph) if s)
+        elif paragraph:
+            pieces.append(paragraph)
+
+    passages, current = [], ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > target:
+            passages.append(current)
+            current = ""
+        current = f"{current} {piece}" if current else piece
+    if current:
+        passages.append(current)
+    return [p for p in passages if len(p) >= MIN_PASSAGE_CHARS] or passages[:1]
+
+def bm25_scores(query, passages):
+    """BM25 score of every passage for the query, computed as one matrix operation."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not passages:
+        return np.zeros(len(passages))
+    column = {t: j for j, t in enumerate(terms)}
+    tf = np.zeros((len(passages), len(terms)), dtype=np.float32)
+    lengths = np.empty(len(passages), dtype=np.float32)
+    for i, passage in enumerate(passages):
+        tokens = tokenize(passage)
+        lengths[i] = len(tokens)
+        for token in tokens:
+            j = column.get(token)
+            if j is not None:
+                tf[i, j] += 1
+    n = len(passages)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5))
+    norm = K1 * (1.0 - B + B * lengths / max(lengths.mean(), 1.0))
+    return (idf * tf * (K1 + 1.0) / (tf + norm[:, None])).sum(axis=1)
+
+def select_passages(query, sources, token_budget):
+    """Picks the passages most relevant to the query across all sources.
+
+    sources: list of (url, text) in search rank order.
+    Returns [(url, [passage, ...])] with each source's passages in document
+    order, sources ordered by their best passage, all within token_budget.
+    """
+    candidates = []  # (url index, position, passage)
+    for s, (_, text) in enumerate(sources):
+        candidates.extend((s, p, passage) for p, passage in enumerate(split_passages(text)))
+    if not candidates:
+        return []
+
+    scores = bm25_scores(query, [c[2] for c in candidates])
+    # Best score first; ties go to the higher ranked source and the earlier passage
+    order = sorted(range(len(candidates)), key=lambda i: (-scores[i], candidates[i][0], candidates[i][1]))
+    # Passages sharing no word with the query are only used when nothing matched at all
+    if scores.max() > 0:
+        order = [i for i in order if scores[i] > 0]
+    chosen, remaining = [], token_budget
+    for i in order:
+        cost = count_tokens(candidates[i][2]) + 1
+        if cost > remaining:
+            continue
+        chosen.append(i)
+        remaining -= cost
+        if remaining < 32:
+            break
+
+    best = {}
+    for rank, i in enumerate(chosen):
+        best.setdefault(candidates[i][0], rank)
+    selected = []
+    for s in sorted(best, key=best.get):
+        passages = sorted((candidates[i][1], candidates[i][2]) for i in chosen if candidates[i][0] == s)
+        selected.append((sources[s][0], [p for _, p in passages]))
+    return selected
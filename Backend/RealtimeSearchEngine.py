@@ -1,11 +1,14 @@
 from googlesearch import search
 import os
 from groq import Groq  # Importing the Groq library to use its API.
-from json import load, dump  # Importing functions to read and write JSON files.
 import datetime  # Importing the datetime module for real-time date and time information.
 from dotenv import dotenv_values  # Importing dotenv_values to read environment variables from a .env file.
  
-from Backend.WebScraper import research_topic
+from Backend.ChatStore import chat_store
+from Backend.ContextBuilder import context_builder
+from Backend.Connectivity import connectivity
+from Backend.ResponseCache import search_cache
+from Backend.ResearchPipeline import research
 
 # Load environment variables from the .env file
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -14,11 +17,6 @@ Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
 GroqAPIKey = env_vars.get("GroqAPIKey")
 
-# Ensure Data directory exists in root
-DATA_DIR = os.path.join(ROOT_DIR, "Data")
-os.makedirs(DATA_DIR, exist_ok=True)
-CHAT_LOG_PATH = os.path.join(DATA_DIR, "ChatLog.json")
-
 # Initialize the Groq client using the provided API key
 client = Groq(api_key=GroqAPIKey)
 
@@ -26,17 +24,7 @@ client = Groq(api_key=GroqAPIKey)
 System = f"""Hello, I am {Username}, You are an Autonomous Research Agent named {Assistantname}.
 Your job is to read the provided website content and create a professional, accurate, and cited report."""
 
-# Try to load the chat log
-try:
-    if os.path.exists(CHAT_LOG_PATH):
-        with open(CHAT_LOG_PATH, "r") as f:
-            messages = load(f)
-    else:
-        messages = []
-        with open(CHAT_LOG_PATH, "w") as f:
-            dump(messages, f)
-except Exception:
-    messages = []
+OFFLINE_MESSAGE = "My uplink to the web is down at the moment, sir. I'll be able to research this once the connection is back."
 
 #Function to perform a Google search and format the results.
 
@@ -51,14 +39,6 @@ def GoogleSearch(query):
     Answer += "[end]"
     return Answer
 
-"""SystemChatBot = [{"role": "system", "content": System}]
-
-# Function to get real-time date and time information
-def RealtimeInformation():
-    current_date_time = datetime.datetime.now()
-    hour = int(current_date_time.strftime("%H"))
-    return hour  # Return only the hour for time-based greeting"""
-
 # Function to clean and format the chatbot's response
 def AnswerModifier(Answer):
     lines = Answer.split('\n')
@@ -66,18 +46,6 @@ def AnswerModifier(Answer):
     modified_answer = '\n'.join(non_empty_lines)
     return modified_answer
       
-# Predefined chatbot conversation system message and an initial user message.
-
-SystemChatBot = [
-
-{"role": "system", "content": System},
-
-{"role": "user", "content": "Hi"},
-
-{"role": "assistant", "content": "Hello, how can I help you?"}
-
-]
-
 #Function to get real-time information like the current date and time.
 
 def Information():
@@ -114,54 +82,92 @@ def Information():
 
   return data      
 
-              # Function to handle real-time search and response generation.
-
-def RealtimeSearchEngine(prompt):
-    global SystemChatBot, messages
-    # Load the chat log from the JSON file.
-    with open(CHAT_LOG_PATH, "r") as f:
-        messages = load(f)
-    
-    # 1. Perform Google Search to get URLs
-    search_results = list(search(prompt, advanced=True, num_results=3))
-    urls = [res.url for res in search_results]
-    
-    # 2. Scrape the content of those URLs
-    print(f"Deep researching: {urls}")
-    deep_content = research_topic(urls)
-    
-    messages.append({"role": "user", "content": f"{prompt}"})
-    
-    # 3. Feed the deep content into the LLM
-    research_context = f"Here is the deep research data from the web:\n{deep_content}"
-    
-    # Generate a response using the Groq client.
-    completion = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[{"role": "system", "content": System}] + 
-                 [{"role": "system", "content": research_context}] + 
-                 [{"role": "system", "content": Information()}] + 
-                 messages,
-        temperature=0.7,
-        max_tokens=2048,
-        top_p=1,
-        stream=True,
-        stop=None
-    )
-    Answer = ""
-    # Concatenate response chunks from the streaming output.
-    for chunk in completion:
-        if chunk.choices[0].delta.content:
-            Answer += chunk.choices[0].delta.content
-    # Clean up the response.
-    Answer = Answer.strip().replace("</s>", "")
-    messages.append({"role": "assistant", "content": Answer})
-    # Save the updated chat log back to the JSON file.
-    with open(CHAT_LOG_PATH, "w") as f:
-        dump(messages, f, indent=4)
-    # Remove the most recent system message from the chatbot conversation.
-    SystemChatBot.pop()
-    return AnswerModifier(Answer=Answer)
+# Real-time search and response generation.
+class ResearchSession:
+    """One conversation with the research agent.
+
+    The session only holds configuration (the chat store it reads history
+    from and logs to, and its system prompt); everything a query needs lives
+    in local variables. Any number of queries can therefore run at once on
+    one session, and each turn is logged with a single atomic append.
+    """
+
+    def __init__(self, store=chat_store, system=System, use_cache=True):
+        self.store = store
+        self.system = system
+        self.use_cache = use_cache
+
+    def stream(self, prompt, use_cache=None):
+        """Researches the prompt on the web and yields the report as text deltas.
+
+        A fresh answer to the same or a near-identical question is replayed from
+        the search cache; pass use_cache=False to force a new search.
+        """
+        use_cache = self.use_cache if use_cache is None else use_cache
+        user_message = {"role": "user", "content": f"{prompt}"}
+        if use_cache and search_cache.enabled:
+            cached = search_cache.get(prompt)
+            if cached is not None:
+                yield cached
+                self.store.append_many([user_message, {"role": "assistant", "content": cached}])
+                return
+
+        # 1-2. Search (fanned out into sub-queries) and scrape pages as their URLs arrive
+        print(f"Deep researching: {prompt}")
+        deep_content = research(prompt)
+        # The cached network state is only advisory: the search is always attempted and
+        # the pipeline reports its outcome, so this is the state after a real attempt
+        if not deep_content and not connectivity.is_online():
+            yield OFFLINE_MESSAGE
+            return
+
+        # 3. Feed the ranked passages into the LLM, one snippet per source, within the token budget
+        snippets = ["--- Source:" + block for block in deep_content.split("\n--- Source:") if block.strip()]
+        messages = context_builder.build(
+            system=[self.system, Information()],
+            query=user_message,
+            history=self.store.get_recent_records(),
+            snippets=snippets,
+            reply_tokens=2048
+        )
+
+        # Generate a response using the Groq client.
+        completion = client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2048,
+            top_p=1,
+            stream=True,
+            stop=None
+        )
+        Answer = ""
+        # Forward response chunks as they arrive from the streaming output.
+        for chunk in completion:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                delta = delta.replace("</s>", "")
+                Answer += delta
+                yield delta
+        # Clean up the response.
+        Answer = Answer.strip()
+        # Append both sides of the turn to the chat log in one write.
+        self.store.append_many([user_message, {"role": "assistant", "content": Answer}])
+        if use_cache and Answer:
+            search_cache.put(prompt, Answer)
+
+    def ask(self, prompt, use_cache=None):
+        return AnswerModifier(Answer="".join(self.stream(prompt, use_cache)).strip())
+
+# Default session shared by the GUI; safe to call from several threads at once
+default_session = ResearchSession()
+
+def RealtimeSearchEngineStream(prompt, use_cache=True):
+    """Researches the prompt on the web and yields the report as text deltas."""
+    return default_session.stream(prompt, use_cache)
+
+def RealtimeSearchEngine(prompt, use_cache=True):
+    return default_session.ask(prompt, use_cache)
 
 # Entry point of the script
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+import re
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from googlesearch import search
+
+from Backend.Connectivity import connectivity
+from Backend.TextUtils import tokenize
+from Backend.WebScraper import (fetch_cached, extract_and_store, format_context, fetch_pool, extract_pool,
+                                RESEARCH_SOURCES, RESEARCH_DEADLINE, RESEARCH_TOKEN_BUDGET)
+
+RESULTS_PER_QUERY = 5
+MAX_SUB_QUERIES = 3
+MIN_SOURCE_CHARS = 400     # Shorter pages do not count toward the quality threshold
+SCRAPE_CONCURRENCY = 6
+
+# "A vs B", "A compared to B", "A; B" are researched as separate sub-queries as well
+_SPLIT_RE = re.compile(r"\s+(?:vs\.?|versus|compared (?:to|with))\s+|;", re.I)
+
+# googlesearch is blocking; each sub-query iterates its results on its own thread
+_search_pool = ThreadPoolExecutor(max_workers=MAX_SUB_QUERIES, thread_name_prefix="search")
+
+def expand_queries(prompt, max_queries=MAX_SUB_QUERIES):
+    """The prompt itself plus one sub-query per side of a comparison."""
+    queries = [prompt]
+    parts = [part.strip(" ?.!,") for part in _SPLIT_RE.split(prompt)]
+    if len(parts) > 1:
+        for part in parts:
+            if tokenize(part) and part.lower() not in (q.lower() for q in queries):
+                queries.append(part)
+    return queries[:max_queries]
+
+def domain_of(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+def _run_search(query, loop, queue):
+    """Thread body: pushes result URLs into the asyncio queue as googlesearch yields them."""
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            pass  # The pipeline already finished and closed its loop
+    try:
+        for result in search(query, advanced=True, num_results=RESULTS_PER_QUERY):
+            connectivity.report_success()
+            put(result.url)
+    except OSError as e:
+        logging.info(f"Search failed for '{query}': {e}")
+        connectivity.report_failure()
+    except Exception as e:
+        logging.info(f"Search failed for '{query}': {e}")
+    finally:
+        put(None)  # End of this sub-query's results
+
+async def _research(prompt, queries, max_sources, deadline, token_budget):
+    loop = asyncio.get_running_loop()
+    urls = asyncio.Queue()
+    ranked = []   # One URL per domain, in arrival order
+    seen_domains = set()
+    found = {}    # url -> extracted text
+    enough = asyncio.Event()
+    semaphore = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+
+    async def scrape(url):
+        async with semaphore:
+            if enough.is_set():
+                return
+            try:
+                result = await loop.run_in_executor(fetch_pool, fetch_cached, url, min(10, deadline))
+                if result[0] == "html":
+                    text = await loop.run_in_executor(extract_pool, extract_and_store, url, *result[1:])
+                else:
+                    text = result[1] if result[0] == "text" else None
+            except Exception as e:
+                logging.info(f"Research source failed: {url}: {e}")
+                return
+        if text and text.strip():
+            found[url] = text
+            if sum(len(t) >= MIN_SOURCE_CHARS for t in found.values()) >= max_sources:
+                enough.set()
+
+    async def dispatch():
+        # Stage 1 -> 2: every new domain is scraped the moment its URL arrives
+        open_searches = len(queries)
+        scrapes = []
+        while open_searches:
+            url = await urls.get()
+            if url is None:
+                open_searches -= 1
+                continue
+            domain = domain_of(url)
+            if domain in seen_domains:
+                continue
+            seen_domains.add(domain)
+            ranked.append(url)
+            scrapes.append(asyncio.ensure_future(scrape(url)))
+        await asyncio.gather(*scrapes)
+        enough.set()  # Nothing more can arrive
+
+    for query in queries:
+        loop.run_in_executor(_search_pool, _run_search, query, loop, urls)
+    dispatcher = asyncio.ensure_future(dispatch())
+    try:
+        await asyncio.wait_for(enough.wait(), deadline)
+    except asyncio.TimeoutError:
+        logging.info(f"Research deadline reached with {len(found)} source(s)")
+    dispatcher.cancel()
+
+    # Prefer substantial pages, then fill up with whatever else came back
+    usable = [u for u in ranked if u in found]
+    usable.sort(key=lambda u: len(found[u]) < MIN_SOURCE_CHARS)
+    sources = [(u, found[u]) for u in usable[:max_sources]]
+    return format_context(sources, prompt, token_budget)
+
+def research(prompt, sub_queries=None, max_sources=RESEARCH_SOURCES, deadline=RESEARCH_DEADLINE,
+             token_budget=RESEARCH_TOKEN_BUDGET):
+    """Searches and scrapes as one staged pipeline; returns the research context block.
+
+    The prompt (or the given sub-queries) is searched in parallel and result
+    URLs are scraped as soon as they arrive, one per domain. The pipeline
+    returns once max_sources substantial pages are in or the deadline passes,
+    so the LLM call is never held up by the slowest search or page.
+    """
+    queries = sub_queries or expand_queries(prompt)
+    # One extra source per additional sub-query so each side of a comparison is covered
+    max_sources += len(queries) - 1
+    return asyncio.run(_research(prompt, queries, max_sources, deadline, token_budget))
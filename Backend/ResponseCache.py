@@ -0,0 +1,225 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from dotenv import dotenv_values
+
+from Backend.Storage import DATA_DIR
+from Backend.TextUtils import tokenize
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
+ResponseCacheEnabled = env_vars.get("ResponseCache", "True").lower() in ("1", "true", "yes", "on")
+ResponseCacheTTL = int(env_vars.get("ResponseCacheTTL", 7 * 24 * 3600))  # Seconds
+ResponseCacheSize = int(env_vars.get("ResponseCacheSize", 1000))         # Entries kept (LRU)
+
+CACHE_PATH = os.path.join(DATA_DIR, "ResponseCache.sqlite3")
+
+# Realtime answers go stale at different speeds depending on what was asked
+FRESHNESS = {
+    "live": 5 * 60,         # Scores, prices, weather
+    "news": 15 * 60,        # Headlines and anything about today
+    "people": 6 * 3600,     # Who someone is, what they are doing
+    "facts": 24 * 3600,     # Everything else
+}
+QUERY_CLASS_WORDS = [
+    ("live", {"score", "scores", "live", "stock", "stocks", "price", "prices", "weather", "temperature", "traffic", "rate", "match"}),
+    ("news", {"news", "latest", "today", "headline", "headlines", "breaking", "now", "current", "currently", "recent", "update", "updates"}),
+    ("people", {"who", "whom", "whose", "ceo", "president", "minister", "founder", "owner", "net", "worth", "married", "age"}),
+]
+SEARCH_MATCH_THRESHOLD = 0.75  # Token-set Jaccard similarity for two queries to share an answer
+SEARCH_CACHE_SIZE = 500
+
+# Queries that refer to the ongoing conversation or to the current moment cannot
+# be answered from a cache keyed on the query alone.
+CONTEXT_WORDS = frozenset("""
+it its this that these those he him his she her they them their previous above again more
+continue also else same earlier last before latest today tomorrow yesterday now current currently
+time date weather news my mine our
+""".split())
+MIN_QUERY_WORDS = 3
+# Realtime queries are about the current moment by nature, and classify_query
+# needs those words; only words that point back into the conversation disqualify them.
+TIME_WORDS = frozenset("latest today tomorrow yesterday now current currently time date weather news".split())
+SEARCH_CONTEXT_WORDS = CONTEXT_WORDS - TIME_WORDS
+
+def normalize_query(query):
+    """Lower-cased words only; punctuation, case and spacing do not change the key."""
+    return " ".join(re.findall(r"[a-z0-9]+", query.lower()))
+
+def is_cacheable(query):
+    words = normalize_query(query).split()
+    return len(words) >= MIN_QUERY_WORDS and not CONTEXT_WORDS.intersection(words)
+
+def is_search_cacheable(query):
+    return not SEARCH_CONTEXT_WORDS.intersection(normalize_query(query).split())
+
+def classify_query(query):
+    """Returns the freshness class of a realtime query: live, news, people or facts."""
+    words = set(normalize_query(query).split())
+    for query_class, markers in QUERY_CLASS_WORDS:
+        if words & markers:
+            return query_class
+    return "facts"
+
+def make_key(query, *context):
+    """Cache key: normalized query plus a digest of the context that shaped the answer."""
+    digest = hashlib.sha256()
+    for part in (normalize_query(query),) + context:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+class ResponseCache:
+    """Persistent LRU cache of chat answers with a time-to-live.
+
+    Entries live in SQLite so they survive restarts. A hit refreshes the
+    entry's last-used time; once the table outgrows max_entries the least
+    recently used rows are evicted, and expired rows are dropped on access.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=ResponseCacheTTL, max_entries=ResponseCacheSize, enabled=ResponseCacheEnabled):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY, query TEXT, response TEXT,
+            created REAL, last_used REAL, hits INTEGER DEFAULT 0)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self._conn.commit()
+
+    def get(self, key):
+        """Returns the cached response or None; counts the hit or miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, query, response):
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO responses (key, query, response, created, last_used, hits) "
+                                   "VALUES (?, ?, ?, ?, ?, 0)", (key, query, response, now, now))
+                self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                self._conn.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                                   "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Response cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {"entries": entries, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
+
+class SearchCache:
+    """Cache of realtime search answers that also matches near-duplicate queries.
+
+    Queries are reduced to their set of content words; a lookup returns the
+    most similar stored query of the same freshness class whose answer is
+    still inside that class's freshness window. The candidate set is small,
+    so matching is a linear scan over an in-memory copy of the table.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=SEARCH_CACHE_SIZE, enabled=ResponseCacheEnabled):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = {}  # rowid -> (tokens, query_class, answer, created)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS search_answers (
+            id INTEGER PRIMARY KEY, query TEXT, tokens TEXT, query_class TEXT, answer TEXT, created REAL)""")
+        self._conn.commit()
+        self._purge(time.time())
+        for rowid, tokens, query_class, answer, created in self._conn.execute(
+                "SELECT id, tokens, query_class, answer, created FROM search_answers"):
+            self._entries[rowid] = (frozenset(tokens.split()), query_class, answer, created)
+
+    def _purge(self, now):
+        for query_class, ttl in FRESHNESS.items():
+            self._conn.execute("DELETE FROM search_answers WHERE query_class = ? AND created < ?", (query_class, now - ttl))
+        self._conn.commit()
+
+    def get(self, query):
+        """Returns a fresh answer for the query or a near duplicate of it, else None."""
+        tokens = frozenset(tokenize(query))
+        query_class = classify_query(query)
+        now = time.time()
+        best, best_score = None, SEARCH_MATCH_THRESHOLD
+        with self._lock:
+            # Follow-ups ("tell me more about it", "news about him") depend on the conversation
+            if tokens and is_search_cacheable(query):
+                for entry_tokens, entry_class, answer, created in self._entries.values():
+                    if entry_class != query_class or now - created > FRESHNESS[entry_class]:
+                        continue
+                    score = len(tokens & entry_tokens) / len(tokens | entry_tokens)
+                    if score >= best_score:
+                        best, best_score = answer, score
+            if best is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return best
+
+    def put(self, query, answer):
+        tokens = tokenize(query)
+        if not tokens or not is_search_cacheable(query):
+            return
+        query_class = classify_query(query)
+        now = time.time()
+        with self._lock:
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO search_answers (query, tokens, query_class, answer, created) VALUES (?, ?, ?, ?, ?)",
+                    (query, " ".join(sorted(set(tokens))), query_class, answer, now))
+                self._entries[cursor.lastrowid] = (frozenset(tokens), query_class, answer, now)
+                self._purge(now)
+                self._conn.execute("DELETE FROM search_answers WHERE id IN (SELECT id FROM search_answers "
+                                   "ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+                self._conn.commit()
+                live = {row[0] for row in self._conn.execute("SELECT id FROM search_answers")}
+                self._entries = {rowid: e for rowid, e in self._entries.items() if rowid in live}
+            except sqlite3.Error as e:
+                logging.error(f"Search cache write failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+        total = self.hits + self.misses
+        return {"entries": entries, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
+
+# Shared caches for the general chat path and the realtime search path
+response_cache = ResponseCache()
+search_cache = SearchCache()
@@ -0,0 +1,94 @@
+import os
+import abc
+import threading
+import logging
+from dotenv import dotenv_values
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
+WhisperModel = env_vars.get("WhisperModel", "small")            # tiny | base | small | medium | large-v3
+STTBackend = env_vars.get("STTBackend", "auto").lower()         # auto | faster-whisper | whisper
+STTComputeType = env_vars.get("STTComputeType", "int8")         # faster-whisper quantization
+
+class STTEngine(abc.ABC):
+    """Speech-to-text backend; the model is loaded on first use, not at import."""
+
+    name = "base"
+
+    def __init__(self, model_size=WhisperModel):
+        self.model_size = model_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self._model is None:
+                print(f"Loading {self.name} model '{self.model_size}'...")
+                self._model = self._load()
+                print("Model loaded.")
+            return self._model
+
+    def preload(self):
+        """Loads the model in the background so the first transcription is not delayed."""
+        threading.Thread(target=self.load, daemon=True).start()
+
+    @abc.abstractmethod
+    def _load(self):
+        """Builds and returns the backend's model object."""
+
+    @abc.abstractmethod
+    def transcribe(self, audio):
+        """Transcribes float32 mono 16 kHz samples in [-1, 1]; returns the text."""
+
+class WhisperEngine(STTEngine):
+    """Reference openai-whisper backend (PyTorch, float32 on CPU)."""
+
+    name = "whisper"
+
+    def _load(self):
+        import whisper
+        return whisper.load_model(self.model_size)
+
+    def transcribe(self, audio):
+        result = self.load().transcribe(audio, fp16=False)  # CPU-only, FP32
+        return result["text"].strip()
+
+class FasterWhisperEngine(STTEngine):
+    """CTranslate2 backend with int8 weights; several times faster than FP32 whisper on CPU."""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size=WhisperModel, compute_type=STTComputeType):
+        super().__init__(model_size)
+        self.compute_type = compute_type
+
+    def _load(self):
+        from faster_whisper import WhisperModel as CT2WhisperModel
+        return CT2WhisperModel(self.model_size, device="cpu", compute_type=self.compute_type)
+
+    def transcribe(self, audio):
+        segments, _ = self.load().transcribe(audio, beam_size=1)
+        return "".join(segment.text for segment in segments).strip()
+
+def _faster_whisper_available():
+    try:
+        import faster_whisper
+        return True
+    except ImportError:
+        return False
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_stt_engine():
+    """Returns the configured engine (created once, model not yet loaded)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            if STTBackend == "faster-whisper" or (STTBackend == "auto" and _faster_whisper_available()):
+                _engine = FasterWhisperEngine()
+            else:
+                if STTBackend not in ("whisper", "auto"):
+                    logging.warning(f"Unknown STTBackend '{STTBackend}', using whisper")
+                _engine = WhisperEngine()
+        return _engine
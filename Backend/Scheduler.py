@@ -1,70 +1,296 @@
 import json
 import time
+import heapq
 import datetime
 import os
 import threading
 import logging
 
-# Path for task storage
-TASKS_FILE = os.path.join("Data", "Tasks.json")
+from Backend.Storage import DATA_DIR
+from Backend.TimeParser import parse_reminder, next_occurrence, describe_rule, ReminderParseError
 
-def load_tasks():
-    if not os.path.exists(TASKS_FILE):
+# Path for task storage: a snapshot plus a journal of changes made since it was written
+TASKS_FILE = os.path.join(DATA_DIR, "Tasks.json")
+JOURNAL_FILE = os.path.join(DATA_DIR, "Tasks.journal")
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+MAX_WAIT = 300  # Re-check the clock at least this often while a task is pending (suspend, clock changes)
+COMPACT_EVERY = 500  # Journal entries before they are folded into the snapshot
+
+def load_tasks(path=TASKS_FILE):
+    if not os.path.exists(path):
         return []
     try:
-        with open(TASKS_FILE, "r") as f:
+        with open(path, "r") as f:
             return json.load(f)
     except:
         return []
 
-def save_tasks(tasks):
-    os.makedirs("Data", exist_ok=True)
-    with open(TASKS_FILE, "w") as f:
+def save_tasks(tasks, path=TASKS_FILE):
+    """Replaces the snapshot atomically: after a crash there is either the old file or the new one."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
         json.dump(tasks, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(path))
+
+def _fsync_dir(path):
+    """Makes a rename durable on POSIX; Windows has no directory handles to sync."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class TaskStore:
+    """Crash-safe task persistence that only writes what changed.
+
+    Every add and status change is one JSON line appended to a journal and
+    fsynced before the call returns, so inserts and updates are O(1). Every
+    COMPACT_EVERY entries (and on start) the journal is folded into an
+    atomically replaced snapshot and truncated. Replaying a journal over a
+    snapshot is idempotent, so a crash between the two steps loses nothing.
+
+    All writes go through one lock, so within the process there is a single
+    writer. The files belong to one process: the store keeps the full task
+    set in memory and compaction rewrites the snapshot from it, so a second
+    process writing the same files would lose its entries. Tasks found
+    "running" at start were interrupted mid-run by a crash and go back to
+    "pending".
+    """
+
+    def __init__(self, path=TASKS_FILE, journal_path=JOURNAL_FILE):
+        self.path = path
+        self.journal_path = journal_path
+        self._lock = threading.Lock()
+        self._journal = None
+        self._entries = 0
+        self.tasks = {}
+        snapshot = load_tasks(path)
+        # Legacy Tasks.json ids were whole seconds, so two tasks added in the same second
+        # share one; give the later ones fresh ids instead of letting them overwrite each other
+        next_id = max((task["id"] for task in snapshot), default=0) + 1
+        reassigned = 0
+        for task in snapshot:
+            if task["id"] in self.tasks:
+                logging.warning(f"Task id {task['id']} is used twice in {path}; "
+                                f"reassigning '{task.get('task')}' to id {next_id}")
+                task["id"] = next_id
+                next_id += 1
+                reassigned += 1
+            self.tasks[task["id"]] = task
+        replayed = os.path.exists(journal_path)
+        if replayed:
+            with open(journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        break  # Torn last line
+        interrupted = [t for t in self.tasks.values() if t["status"] == "running"]
+        for task in interrupted:
+            task["status"] = "pending"
+        if interrupted:
+            logging.info(f"Re-queued {len(interrupted)} task(s) interrupted by a crash")
+        if replayed or interrupted or reassigned:
+            with self._lock:
+                self._compact()
+
+    def _apply(self, entry):
+        if entry["op"] == "add":
+            self.tasks[entry["task"]["id"]] = entry["task"]
+        elif entry["op"] == "update" and entry["id"] in self.tasks:
+            self.tasks[entry["id"]].update(entry["fields"])
+
+    def _log(self, entry):
+        """Appends one journal line durably. Caller holds self._lock."""
+        if self._journal is None:
+            os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps(entry) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._entries += 1
+        if self._entries >= COMPACT_EVERY:
+            self._compact()
+
+    def _compact(self):
+        """Folds the journal into the snapshot. Caller holds self._lock."""
+        save_tasks(list(self.tasks.values()), self.path)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._entries = 0
+
+    def add(self, task):
+        with self._lock:
+            self.tasks[task["id"]] = task
+            self._log({"op": "add", "task": task})
+
+    def update(self, task_id, **fields):
+        with self._lock:
+            self.tasks[task_id].update(fields)
+            self._log({"op": "update", "id": task_id, "fields": fields})
+
+    def pending(self):
+        with self._lock:
+            return [dict(t) for t in self.tasks.values() if t["status"] == "pending"]
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
 
-def add_task(task_text, execution_time):
+def parse_execution_time(execution_time):
+    """Accepts a datetime, seconds from now, a "%Y-%m-%d %H:%M:%S" string or a phrase like "9pm tomorrow"."""
+    if isinstance(execution_time, datetime.datetime):
+        return execution_time
+    if isinstance(execution_time, (int, float)):
+        return datetime.datetime.now() + datetime.timedelta(seconds=execution_time)
+    try:
+        return datetime.datetime.strptime(execution_time.strip(), TIME_FORMAT)
+    except ValueError:
+        return parse_reminder(execution_time)[1]
+
+class Scheduler:
+    """Event-driven task runner.
+
+    Due times live in a min-heap. The worker sleeps on a condition variable
+    until the earliest one (or indefinitely when nothing is pending) and is
+    woken early whenever a sooner task is added.
+
+    A recurring task keeps its rule under "repeat" and only its next due
+    time; after each run the next occurrence is computed and the task goes
+    back on the heap, so a task costs one entry however often it repeats.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._heap = []  # (due timestamp, task id)
+        self._cond = threading.Condition()
+        self._callback = None
+        self._thread = None
+        self._last_id = 0
+        self._loaded = False
+
+    def _ensure_store(self):
+        with self._cond:
+            if self._loaded:
+                return
+            if self.store is None:
+                self.store = TaskStore()
+            for task in self.store.pending():
+                self._push(task)
+            self._last_id = max(self.store.tasks, default=0)
+            self._loaded = True
+
+    def _push(self, task):
+        try:
+            # "due" keeps sub-second precision; older tasks only have the formatted time
+            due = task.get("due") or parse_execution_time(task["time"]).timestamp()
+        except Exception as e:
+            logging.error(f"Unreadable time for task {task['id']}: {e}")
+            self.store.update(task["id"], status="error")
+            return
+        heapq.heappush(self._heap, (due, task["id"]))
+        self._cond.notify()
+
+    def add(self, task_text, execution_time, repeat=None):
+        when = parse_execution_time(execution_time)
+        self._ensure_store()
+        with self._cond:
+            # Millisecond ids stay unique even when several tasks are added in the same second
+            self._last_id = max(int(time.time() * 1000), self._last_id + 1)
+            task = {"id": self._last_id, "task": task_text, "time": when.strftime(TIME_FORMAT),
+                    "due": when.timestamp(), "status": "pending"}
+            if repeat:
+                task["repeat"] = repeat
+            self.store.add(task)
+            self._push(task)
+        return task
+
+    def start(self, execute_callback):
+        self._ensure_store()
+        with self._cond:
+            self._callback = execute_callback
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.time()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    timeout = min(self._heap[0][0] - now, MAX_WAIT) if self._heap else None
+                    self._cond.wait(timeout)
+                _, task_id = heapq.heappop(self._heap)
+                callback = self._callback
+            task = self.store.tasks.get(task_id)
+            if task is None or task["status"] != "pending":
+                continue
+            # Recorded before running so a crash mid-run re-queues the task on the next start
+            self.store.update(task_id, status="running")
+            try:
+                logging.info(f"Executing task: {task['task']}")
+                callback(task["task"])
+            except Exception as e:
+                logging.error(f"Error executing task {task_id}: {e}")
+                self.store.update(task_id, status="error")
+                continue
+            if task.get("repeat"):
+                self._reschedule(task)
+            else:
+                self.store.update(task_id, status="completed")
+
+    def _reschedule(self, task):
+        """Queues the next occurrence of a recurring task; missed ones (e.g. while suspended) are skipped."""
+        after = max(datetime.datetime.now(), datetime.datetime.fromtimestamp(task["due"]))
+        try:
+            when = next_occurrence(task["repeat"], after)
+        except Exception as e:
+            logging.error(f"Bad recurrence for task {task['id']}: {e}")
+            when = None
+        if when is None:
+            self.store.update(task["id"], status="completed")
+            return
+        with self._cond:
+            self.store.update(task["id"], time=when.strftime(TIME_FORMAT), due=when.timestamp(), status="pending")
+            heapq.heappush(self._heap, (when.timestamp(), task["id"]))
+
+# Shared scheduler; the store is opened on first use
+scheduler = Scheduler()
+
+def add_task(task_text, execution_time, repeat=None):
     """
     task_text: What to do
-    execution_time: datetime string or seconds from now
+    execution_time: datetime string, phrase or seconds from now
+    repeat: optional recurrence rule (see TimeParser.next_occurrence)
     """
-    tasks = load_tasks()
-    new_task = {
-        "id": int(time.time()),
-        "task": task_text,
-        "time": execution_time,
-        "status": "pending"
-    }
-    tasks.append(new_task)
-    save_tasks(tasks)
+    scheduler.add(task_text, execution_time, repeat)
     return f"Reminder set: {task_text} at {execution_time}"
 
-def check_and_run_tasks(execute_callback):
-    """Loop to check for due tasks. Runs in a separate thread."""
-    while True:
-        tasks = load_tasks()
-        now = datetime.datetime.now()
-        updated = False
-        
-        for task in tasks:
-            if task["status"] == "pending":
-                try:
-                    task_time = datetime.datetime.strptime(task["time"], "%Y-%m-%d %H:%M:%S")
-                    if now >= task_time:
-                        logging.info(f"Executing task: {task['task']}")
-                        execute_callback(task["task"])
-                        task["status"] = "completed"
-                        updated = True
-                except Exception as e:
-                    logging.error(f"Error executing task {task['id']}: {e}")
-                    task["status"] = "error"
-                    updated = True
-        
-        if updated:
-            save_tasks(tasks)
-        
-        time.sleep(30) # Check every 30 seconds
+def add_reminder(text):
+    """Schedules a spoken or typed reminder such as "9:00pm 25th june business meeting"."""
+    try:
+        message, when, repeat = parse_reminder(text)
+    except ReminderParseError:
+        return "I couldn't work out when to remind you. Try something like 'in 10 minutes' or 'tomorrow at 9am'."
+    task = scheduler.add(message, when, repeat)
+    reply = f"Reminder set: {message} at {task['time']}"
+    if repeat:
+        reply += f" ({describe_rule(repeat)})"
+    return reply
 
 def start_scheduler(execute_callback):
-    thread = threading.Thread(target=check_and_run_tasks, args=(execute_callback,), daemon=True)
-    thread.start()
-    return thread
+    return scheduler.start(execute_callback)
@@ -0,0 +1,213 @@
+import os
+import json
+import queue
+import atexit
+import threading
+import logging
+import numpy as np
+
+from Backend.ChatStore import chat_store, DATA_DIR
+from Backend.Embeddings import get_embedder
+
+VECTORS_PATH = os.path.join(DATA_DIR, "MemoryVectors.f32")
+IDS_PATH = os.path.join(DATA_DIR, "MemoryVectors.ids")
+META_PATH = os.path.join(DATA_DIR, "MemoryVectors.json")
+
+INITIAL_CAPACITY = 1024
+SEARCH_BLOCK = 65536  # Rows scored per matrix multiplication
+EMBED_BATCH = 64
+MIN_SIMILARITY = 0.25  # Below this a turn is treated as unrelated
+
+class SemanticMemory:
+    """Vector recall over user/assistant turns backed by memory-mapped float32 files.
+
+    Row i of the vector matrix holds the embedding of one turn and row i of the
+    ids file holds the message id of that turn's user message. Nothing is loaded
+    into Python objects; search is a blocked matrix product over the mapping.
+    """
+
+    def __init__(self, store=chat_store, vectors_path=VECTORS_PATH, ids_path=IDS_PATH, meta_path=META_PATH):
+        self.store = store
+        self.vectors_path = vectors_path
+        self.ids_path = ids_path
+        self.meta_path = meta_path
+        self.embedder = get_embedder()
+        self.dim = self.embedder.dim
+        self._lock = threading.Lock()
+        self._count = 0
+        self._last_msg_id = -1
+        self._vectors = None
+        self._ids = None
+        self._queue = queue.Queue()
+
+        self._open()
+        threading.Thread(target=self._worker, daemon=True).start()
+        self._queue.put(None)  # Catch up with turns logged since the last run
+        store.add_listener(self._on_record)
+        atexit.register(self.flush)
+
+    def _open(self):
+        meta = {}
+        if os.path.exists(self.meta_path):
+            try:
+                with open(self.meta_path, "r") as f:
+                    meta = json.load(f)
+            except Exception:
+                meta = {}
+
+        if (meta.get("model") != self.embedder.name or meta.get("dim") != self.dim
+                or not os.path.exists(self.vectors_path)):
+            # New or different embedder: vectors are not comparable, start over.
+            meta = {"model": self.embedder.name, "dim": self.dim, "count": 0, "last_msg_id": -1, "capacity": INITIAL_CAPACITY}
+            for path in (self.vectors_path, self.ids_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        self._count = meta["count"]
+        self._last_msg_id = meta["last_msg_id"]
+        self._map(max(meta.get("capacity", INITIAL_CAPACITY), INITIAL_CAPACITY))
+
+    def _map(self, capacity):
+        """(Re)maps the backing files with room for `capacity` rows."""
+        for path, itemsize in ((self.vectors_path, 4 * self.dim), (self.ids_path, 8)):
+            size = capacity * itemsize
+            with open(path, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._ids.flush()
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self._ids = np.memmap(self.ids_path, dtype=np.int64, mode="r+", shape=(capacity,))
+        self._capacity = capacity
+
+    def _write_meta(self):
+        meta = {"model": self.embedder.name, "dim": self.dim, "count": self._count,
+                "last_msg_id": self._last_msg_id, "capacity": self._capacity}
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _on_record(self, record):
+        if record["role"] == "assistant":
+            self._queue.put(record)
+
+    def _worker(self):
+        while True:
+            self._queue.get()
+            try:
+                self._index_pending()
+            except Exception as e:
+                logging.error(f"Semantic memory indexing failed: {e}")
+
+    def _index_pending(self):
+        """Embeds every complete turn after the last indexed message, in batches."""
+        turns = []
+        previous = None
+        for record in self.store.iter_records(self._last_msg_id + 1):
+            if record["role"] == "assistant" and previous is not None and previous["role"] == "user":
+                turns.append((previous["id"], record["id"], f"{previous['content']}\n{record['content']}"))
+                if len(turns) >= EMBED_BATCH:
+                    self._append(turns)
+                    turns = []
+            previous = record
+        if turns:
+            self._append(turns)
+
+    def _append(self, turns):
+        vectors = self.embedder.embed([t[2] for t in turns])
+        with self._lock:
+            needed = self._count + len(turns)
+            if needed > self._capacity:
+                capacity = self._capacity
+                while capacity < needed:
+                    capacity *= 2
+                self._map(capacity)
+            self._vectors[self._count:needed] = vectors
+            self._ids[self._count:needed] = [t[0] for t in turns]
+            self._count = needed
+            self._last_msg_id = turns[-1][1]
+            self._vectors.flush()
+            self._ids.flush()
+            self._write_meta()
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._ids.flush()
+                self._write_meta()
+
+    def search_many(self, queries, k=3):
+        """Top-k (user_message_id, similarity) lists for a batch of queries."""
+        q = self.embedder.embed(queries)
+        with self._lock:
+            count = self._count
+            vectors, ids = self._vectors, self._ids
+        if count == 0:
+            return [[] for _ in queries]
+
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, count, SEARCH_BLOCK):
+            block = vectors[start:min(start + SEARCH_BLOCK, count)]
+            scores = q @ block.T  # (queries, rows)
+            take = min(k, scores.shape[1])
+            rows = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, rows, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, rows + start], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            order = np.argsort(-scores)
+            results.append([(int(ids[rows[i]]), float(scores[i])) for i in order])
+        return results
+
+    def search_pairs(self, query, k=3, min_score=MIN_SIMILARITY):
+        """Returns the k most similar past exchanges in the same shape as MemoryIndex.search_pairs."""
+        pairs = []
+        for user_id, score in self.search_many([query], k=k)[0]:
+            if score < min_score:
+                continue
+            user = self.store.get_message(user_id)
+            reply = self.store.get_message(user_id + 1)
+            if user is None:
+                continue
+            pairs.append({
+                "user": user["content"],
+                "assistant": reply["content"] if reply and reply["role"] == "assistant" else "...",
+                "user_id": user_id,
+                "score": score,
+            })
+        return pairs
+
+_semantic_memory = None
+_semantic_lock = threading.Lock()
+
+def get_semantic_memory():
+    """Returns the shared SemanticMemory, created on first use (may load an embedding model)."""
+    global _semantic_memory
+    with _semantic_lock:
+        if _semantic_memory is None:
+            _semantic_memory = SemanticMemory()
+        return _semantic_memory
+
+def peek_semantic_memory():
+    """The shared SemanticMemory if it is already built, else None; never blocks."""
+    return _semantic_memory
+
+def preload():
+    """Builds the shared SemanticMemory in the background so no chat turn waits for the model."""
+    if _semantic_memory is None:
+        threading.Thread(target=_preload, daemon=True).start()
+
+def _preload():
+    try:
+        get_semantic_memory()
+    except Exception as e:
+        logging.error(f"Semantic memory unavailable: {e}")
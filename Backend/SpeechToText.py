@@ -1,15 +1,13 @@
 import os
 import time
 import numpy as np
-import pyaudio
-import wave
 from dotenv import dotenv_values
 import mtranslate as mt
-try:
-    import whisper
-except ImportError as e:
-    print(f"Error importing Whisper: {e}")
-    raise
+
+from Backend.STTEngine import get_stt_engine
+from Backend.AudioCapture import get_microphone
+from Backend.VAD import VoiceActivityDetector, Endpointer
+from Backend.WakeWord import WakeWordDetector
 
 # Load environment variables from the .env file.
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -17,15 +15,13 @@ env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
 InputLanguage = env_vars.get("InputLanguage", "en")
 
 # Audio recording parameters
-CHUNK = 1024
-FORMAT = pyaudio.paInt16
-CHANNELS = 1
-RATE = 16000
-RECORD_SECONDS = 5
-DATA_DIR = os.path.join(ROOT_DIR, "Data")
-os.makedirs(DATA_DIR, exist_ok=True)
-TEMP_AUDIO_PATH = os.path.join(DATA_DIR, "temp_audio.wav")
-silence_threshold = 50
+MAX_WAIT = 15        # Seconds to wait for speech to start
+MAX_UTTERANCE = 30   # Seconds before a running utterance is cut off
+WAKE_MIN_SECONDS = 0.5  # Utterances (with pre-roll) outside this range cannot be the wake word
+WAKE_MAX_SECONDS = 2.5
+
+# One detector for the session, so the learned noise floor carries over between utterances
+vad = VoiceActivityDetector()
 
 # Define the path for temporary files.
 TempDirPath = os.path.join(ROOT_DIR, "Frontend", "Files")
@@ -61,81 +57,94 @@ def UniversalTranslator(Text):
     except Exception as e:
         return Text
 
-# Load the Whisper model once at startup to improve performance
-print("Loading Whisper model...")
-model = whisper.load_model("small")  # small model for better speed/accuracy balance
-print("Model loaded.")
+# Speech-to-text engine; the model loads on first transcription (see STTEngine)
+stt_engine = get_stt_engine()
+
+# Function to cut the next utterance out of the microphone stream.
+# Returns int16 samples, or None when nothing was said before max_wait (or should_stop() turned true).
+def CaptureUtterance(mic, max_wait=MAX_WAIT, max_seconds=MAX_UTTERANCE, should_stop=None):
+    endpointer = Endpointer(vad, rate=mic.rate)
+    timeout = time.time() + max_wait if max_wait else None
+    cursor = mic.position
+
+    # Follow the ring buffer until the endpointer sees the speech end
+    while True:
+        audio_data, new_cursor = mic.read(cursor, timeout=0.5)
+        if len(audio_data) and endpointer.feed(audio_data, new_cursor - len(audio_data)):
+            break
+        cursor = new_cursor
+        if should_stop is not None and should_stop():
+            return None
+        if not endpointer.started and timeout and time.time() > timeout:
+            return None
+        if endpointer.started and cursor - endpointer.start > max_seconds * mic.rate:
+            endpointer.end = cursor
+            break
+
+    # Include the pre-roll before onset so the first word is not clipped
+    return mic.get_range(endpointer.audio_start, endpointer.end)
 
 # Function to record audio and perform speech recognition using Whisper
 def SpeechRecognition():
     try:
-        p = pyaudio.PyAudio()
-        stream = p.open(format=FORMAT, channels=CHANNELS, rate=RATE, input=True, frames_per_buffer=CHUNK)
+        # The capture service keeps one stream open for the whole session
+        mic = get_microphone()
     except Exception as e:
         return "[Audio initialization failed]"
 
     print("Listening... Please speak.")
-    
-    frames = []
-    max_wait = 15
-    timeout = time.time() + max_wait
-    silence_duration = 2
-    last_sound_time = time.time()
-
-    # Record audio
+
     try:
-        while time.time() < timeout:
-            data = stream.read(CHUNK, exception_on_overflow=False)
-            frames.append(data)
-            
-            audio_data = np.frombuffer(data, dtype=np.int16)
-            rms = np.sqrt(np.mean(np.square(audio_data), where=(audio_data!=0)))
-            if rms > silence_threshold:
-                last_sound_time = time.time()
-            elif time.time() - last_sound_time > silence_duration:
-                break
+        frames = CaptureUtterance(mic)
     except Exception as e:
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
         return "[Recording error]"
 
-    # Stop and close the stream
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
-
-    # Save the recorded audio to a WAV file
-    if frames:
-        try:
-            wf = wave.open(TEMP_AUDIO_PATH, 'wb')
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(p.get_sample_size(FORMAT))
-            wf.setframerate(RATE)
-            wf.writeframes(b''.join(frames))
-            wf.close()
-            time.sleep(1)
-        except Exception as e:
-            return "[Audio file saving error]"
-
-        # Transcribe the audio using the pre-loaded Whisper model
-        try:
-            if os.path.exists(TEMP_AUDIO_PATH) and os.path.getsize(TEMP_AUDIO_PATH) > 0:
-                result = model.transcribe(TEMP_AUDIO_PATH, fp16=False)  # CPU-only, FP32
-                text = result["text"].strip()
-                if os.path.exists(TEMP_AUDIO_PATH):
-                    os.remove(TEMP_AUDIO_PATH)
-                if text:
-                    return text
-                else:
-                    return "[No speech detected]"
-            else:
-                return "[No audio file for transcription]"
-        except Exception as e:
-            return f"[Transcription error: {str(e)}]"
-    else:
+    if frames is None or not len(frames):
         return "[No speech detected]"
 
+    # Transcribe straight from memory: int16 PCM -> float32 in [-1, 1]
+    try:
+        audio = frames.astype(np.float32) / 32768.0
+        text = stt_engine.transcribe(audio)
+        if text:
+            return text
+        else:
+            return "[No speech detected]"
+    except Exception as e:
+        return f"[Transcription error: {str(e)}]"
+
+wake_detector = None
+
+# Function to block until the wake word is heard; returns False as soon as
+# should_stop() is true (e.g. the mic was switched on by hand or the app closes).
+# Short utterances are matched against enrolled MFCC templates; Whisper only
+# runs while the detector is still collecting its first templates.
+def WaitForWakeWord(wake_word, should_stop=None):
+    global wake_detector
+    if wake_detector is None or wake_detector.wake_word != wake_word.lower():
+        wake_detector = WakeWordDetector(wake_word)
+    mic = get_microphone()
+
+    while should_stop is None or not should_stop():
+        frames = CaptureUtterance(mic, max_wait=None, max_seconds=WAKE_MAX_SECONDS + 1, should_stop=should_stop)
+        if frames is None:
+            continue
+        duration = len(frames) / mic.rate
+        if not WAKE_MIN_SECONDS <= duration <= WAKE_MAX_SECONDS:
+            continue
+        if should_stop is not None and should_stop():
+            break
+        if wake_detector.ready:
+            if wake_detector.matches(frames):
+                return True
+            continue
+        # Enrollment: let Whisper confirm, then keep the audio as a template
+        text = stt_engine.transcribe(frames.astype(np.float32) / 32768.0).lower()
+        if wake_detector.wake_word in text:
+            wake_detector.enroll(frames)
+            return True
+    return False
+
 if __name__ == "__main__":
     while True:
         Text = SpeechRecognition()
@@ -0,0 +1,33 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Shared data location and file locking. Kept free of heavier imports so any
+# module can use them without loading the chat log or other stores.
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "Data")
+os.makedirs(DATA_DIR, exist_ok=True)
+
+@contextmanager
+def locked_file(f):
+    """Exclusive advisory lock on an open file, so separate processes never interleave writes."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        # msvcrt locks a byte range; byte 0 is the agreed lock region for the whole file
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield f
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
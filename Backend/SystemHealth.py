@@ -1,62 +1,297 @@
-import subprocess
 import os
+import sys
+import glob
+import time
+import threading
 import logging
 
-def get_system_stats():
-    """Returns a dictionary with CPU, RAM, and Battery stats on Windows using PowerShell."""
-    try:
-        # Requesting specific properties in a cleaner list format
-        ps_cmd = (
-            "Get-CimInstance Win32_Processor | Select-Object -ExpandProperty LoadPercentage; "
-            "Get-CimInstance Win32_OperatingSystem | Select-Object FreePhysicalMemory, TotalVisibleMemorySize | Format-List; "
-            "Get-CimInstance Win32_Battery | Select-Object EstimatedChargeRemaining | Format-List"
-        )
-        
-        system_root = os.environ.get('SystemRoot', 'C:\\Windows')
-        powershell_path = os.path.join(system_root, 'System32\\WindowsPowerShell\\v1.0\\powershell.exe')
-        
-        process = subprocess.Popen(
-            [powershell_path, "-NoProfile", "-Command", ps_cmd],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding='utf-8', # Use UTF-8 for better encoding support
-            shell=False 
-        )
-        stdout, stderr = process.communicate(timeout=5)
-        
-        if not stdout:
-            return {"CPU": "0%", "RAM": "0%", "Battery": "N/A"}
-
-        lines = [line.strip() for line in stdout.split('\n') if line.strip()]
-        
-        cpu_usage = "0"
-        free_mem = 0
-        total_mem = 0
-        battery = "N/A"
-
-        for line in lines:
-            if line.isdigit() and int(line) <= 100:
-                cpu_usage = line
-            elif "FreePhysicalMemory" in line:
-                free_mem = int(line.split(":")[1].strip())
-            elif "TotalVisibleMemorySize" in line:
-                total_mem = int(line.split(":")[1].strip())
-            elif "EstimatedChargeRemaining" in line:
-                battery = line.split(":")[1].strip() + "%"
-
-        ram_perc = "0%"
-        if total_mem > 0:
-            ram_perc = f"{round(((total_mem - free_mem) / total_mem) * 100, 1)}%"
+from Backend.Telemetry import TelemetryBuffer, RateCounter, history_capacity
+
+# Optional: psutil covers every platform; without it /proc or the Win32 API is read directly
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SAMPLE_INTERVAL = 2  # Seconds between samples
+EMPTY_STATS = {"CPU": "N/A", "RAM": "N/A", "Battery": "N/A"}
+LOAD_WINDOW = 300    # Seconds of history behind the load summary in the system prompt
+
+class ProcReader:
+    """Linux: /proc/stat, /proc/meminfo, /proc/self/statm, /proc/diskstats, /proc/net/dev and /sys/class/power_supply."""
+
+    def __init__(self):
+        self._last_cpu = self._cpu_times()
+
+    @staticmethod
+    def _cpu_times():
+        with open("/proc/stat") as f:
+            values = [int(v) for v in f.readline().split()[1:]]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+        return idle, sum(values)
+
+    def cpu_percent(self):
+        idle, total = self._cpu_times()
+        last_idle, last_total = self._last_cpu
+        self._last_cpu = (idle, total)
+        elapsed = total - last_total
+        return 100.0 * (1 - (idle - last_idle) / elapsed) if elapsed > 0 else 0.0
+
+    @staticmethod
+    def ram_percent():
+        info = {}
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                info[key] = int(value.split()[0])
+        available = info.get("MemAvailable", info.get("MemFree", 0))
+        return 100.0 * (1 - available / info["MemTotal"])
+
+    @staticmethod
+    def battery_percent():
+        for path in glob.glob("/sys/class/power_supply/BAT*/capacity"):
+            with open(path) as f:
+                return float(f.read().strip())
+        return None
+
+    @staticmethod
+    def rss_bytes():
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    @staticmethod
+    def disk_bytes():
+        """(read, written) across whole disks; partitions are skipped so nothing counts twice."""
+        read = written = 0
+        with open("/proc/diskstats") as f:
+            for line in f:
+                fields = line.split()
+                if os.path.exists(f"/sys/block/{fields[2]}/device"):
+                    read += int(fields[5]) * 512
+                    written += int(fields[9]) * 512
+        return read, written
+
+    @staticmethod
+    def net_bytes():
+        """(received, sent) across all interfaces except loopback."""
+        received = sent = 0
+        with open("/proc/net/dev") as f:
+            for line in f.readlines()[2:]:
+                name, data = line.split(":", 1)
+                if name.strip() == "lo":
+                    continue
+                fields = data.split()
+                received += int(fields[0])
+                sent += int(fields[8])
+        return received, sent
+
+class WindowsReader:
+    """Windows: GetSystemTimes, GlobalMemoryStatusEx, GetSystemPowerStatus and GetProcessMemoryInfo through ctypes."""
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self.ctypes = ctypes
+        self.kernel32 = ctypes.windll.kernel32
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", wintypes.DWORD), ("dwMemoryLoad", wintypes.DWORD),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        class SYSTEM_POWER_STATUS(ctypes.Structure):
+            _fields_ = [("ACLineStatus", ctypes.c_ubyte), ("BatteryFlag", ctypes.c_ubyte),
+                        ("BatteryLifePercent", ctypes.c_ubyte), ("SystemStatusFlag", ctypes.c_ubyte),
+                        ("BatteryLifeTime", wintypes.DWORD), ("BatteryFullLifeTime", wintypes.DWORD)]
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        self._memory = MEMORYSTATUSEX()
+        self._memory.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        self._process_memory = PROCESS_MEMORY_COUNTERS()
+        self._process_memory.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+        self.psapi = ctypes.windll.psapi
+        self.kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        self.psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+        self._power = SYSTEM_POWER_STATUS()
+        self._last_cpu = self._cpu_times()
+
+    def _cpu_times(self):
+        idle, kernel, user = (self.ctypes.c_ulonglong() for _ in range(3))
+        self.kernel32.GetSystemTimes(self.ctypes.byref(idle), self.ctypes.byref(kernel), self.ctypes.byref(user))
+        # Kernel time includes idle time
+        return idle.value, kernel.value + user.value
+
+    def cpu_percent(self):
+        idle, total = self._cpu_times()
+        last_idle, last_total = self._last_cpu
+        self._last_cpu = (idle, total)
+        elapsed = total - last_total
+        return 100.0 * (1 - (idle - last_idle) / elapsed) if elapsed > 0 else 0.0
+
+    def ram_percent(self):
+        self.kernel32.GlobalMemoryStatusEx(self.ctypes.byref(self._memory))
+        return 100.0 * (1 - self._memory.ullAvailPhys / self._memory.ullTotalPhys)
+
+    def battery_percent(self):
+        if not self.kernel32.GetSystemPowerStatus(self.ctypes.byref(self._power)):
+            return None
+        percent = self._power.BatteryLifePercent
+        # 255 means unknown, flag 128 means there is no battery
+        return None if percent == 255 or self._power.BatteryFlag & 128 else float(percent)
+
+    def rss_bytes(self):
+        handle = self.kernel32.GetCurrentProcess()
+        if not self.psapi.GetProcessMemoryInfo(handle, self.ctypes.byref(self._process_memory), self._process_memory.cb):
+            return None
+        return self._process_memory.WorkingSetSize
 
+    # System-wide disk and network counters need psutil on Windows
+    @staticmethod
+    def disk_bytes():
+        return None
+
+    @staticmethod
+    def net_bytes():
+        return None
+
+class PsutilReader:
+    def __init__(self):
+        psutil.cpu_percent(None)  # Primes the CPU counters
+        self._process = psutil.Process()
+
+    @staticmethod
+    def cpu_percent():
+        return psutil.cpu_percent(None)
+
+    @staticmethod
+    def ram_percent():
+        return psutil.virtual_memory().percent
+
+    @staticmethod
+    def battery_percent():
+        battery = psutil.sensors_battery() if hasattr(psutil, "sensors_battery") else None
+        return float(battery.percent) if battery else None
+
+    def rss_bytes(self):
+        return self._process.memory_info().rss
+
+    @staticmethod
+    def disk_bytes():
+        counters = psutil.disk_io_counters()
+        return (counters.read_bytes, counters.write_bytes) if counters else None
+
+    @staticmethod
+    def net_bytes():
+        counters = psutil.net_io_counters()
+        return (counters.bytes_recv, counters.bytes_sent) if counters else None
+
+def _make_reader():
+    if psutil is not None:
+        return PsutilReader()
+    if sys.platform == "win32":
+        return WindowsReader()
+    if os.path.exists("/proc/stat"):
+        return ProcReader()
+    return None
+
+class SystemMonitor:
+    """Background telemetry sampler with a lock-free snapshot.
+
+    A daemon thread samples every SAMPLE_INTERVAL seconds and publishes a new
+    dict by swapping one reference, so snapshot() never waits on a lock or
+    on the OS. Readers get a dict that is never changed after it is published.
+    Every sample is also kept in `history`, a fixed-size ring buffer.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.history = TelemetryBuffer(history_capacity(interval))
+        self._disk = RateCounter()
+        self._net = RateCounter()
+        self._snapshot = dict(EMPTY_STATS)
+        self._ready = threading.Event()
+        try:
+            self._reader = _make_reader()
+        except Exception as e:
+            logging.error(f"System telemetry unavailable: {e}")
+            self._reader = None
+        if self._reader is not None:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def snapshot(self):
+        return self._snapshot
+
+    def wait_for_first_sample(self, timeout=SAMPLE_INTERVAL * 2):
+        self._ready.wait(timeout)
+        return self._snapshot
+
+    def _sample(self):
+        reader = self._reader
+        cpu = reader.cpu_percent()
+        ram = reader.ram_percent()
+        battery = reader.battery_percent()
+        rss = reader.rss_bytes()
+        disk_read, disk_write = self._disk.update(reader.disk_bytes())
+        net_recv, net_sent = self._net.update(reader.net_bytes())
+        now = time.time()
+        self.history.append({
+            "time": now, "cpu": cpu, "ram": ram, "battery": battery,
+            "rss_mb": rss / 2**20 if rss is not None else None,
+            "disk_read_bps": disk_read, "disk_write_bps": disk_write,
+            "net_recv_bps": net_recv, "net_sent_bps": net_sent,
+        })
         return {
-            "CPU": f"{cpu_usage}%",
-            "RAM": ram_perc,
-            "Battery": battery
+            "CPU": f"{round(cpu)}%",
+            "RAM": f"{round(ram, 1)}%",
+            "Battery": f"{round(battery)}%" if battery is not None else "N/A",
+            "time": now,
         }
-    except Exception as e:
-        logging.error(f"Error getting system stats: {e}")
-        return {"CPU": "N/A", "RAM": "N/A", "Battery": "N/A"}
+
+    def load_summary(self, seconds=LOAD_WINDOW):
+        """Mean, p95 and trend (per minute) of CPU and RAM over the last `seconds`."""
+        return {"cpu": self.history.summary("cpu", seconds), "ram": self.history.summary("ram", seconds)}
+
+    def _run(self):
+        while True:
+            # The first CPU reading needs one interval of counter deltas
+            time.sleep(self.interval)
+            try:
+                self._snapshot = self._sample()
+            except Exception as e:
+                logging.error(f"Error getting system stats: {e}")
+            self._ready.set()
+
+# Shared sampler used by the GUI stats cards and the chatbot system prompt
+system_monitor = SystemMonitor()
+
+def get_system_stats():
+    """Latest CPU, RAM and Battery readings as display strings; never blocks."""
+    return system_monitor.snapshot()
+
+def describe_load(seconds=LOAD_WINDOW):
+    """One line on recent load, e.g. "last 5 min: CPU avg 38%, p95 71%, trend +2.1%/min; ...".
+
+    Empty until at least a minute of samples has been collected (see
+    Telemetry.MIN_WINDOW_SECONDS), so one noisy reading is never reported as a trend.
+    """
+    parts = []
+    for name, stats in system_monitor.load_summary(seconds).items():
+        if stats["mean"] is None or stats["slope"] is None:
+            continue
+        parts.append(f"{name.upper()} avg {stats['mean']:.0f}%, p95 {stats['p95']:.0f}%, "
+                     f"trend {stats['slope']:+.1f}%/min")
+    if not parts:
+        return ""
+    _, span = system_monitor.history.coverage("cpu", seconds)
+    return f"last {max(1, round(span / 60))} min: " + "; ".join(parts)
 
 if __name__ == "__main__":
-    print(get_system_stats())
+    print(system_monitor.wait_for_first_sample())
@@ -0,0 +1,141 @@
+import os
+import time
+import threading
+import numpy as np
+from dotenv import dotenv_values
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
+TelemetryHistoryHours = float(env_vars.get("TelemetryHistoryHours", 12))  # History kept in memory
+
+# One row per sample; missing readings are NaN
+FIELDS = ("time", "cpu", "ram", "battery", "rss_mb",
+          "disk_read_bps", "disk_write_bps", "net_recv_bps", "net_sent_bps")
+COLUMN = {name: i for i, name in enumerate(FIELDS)}
+# A window summary needs this much history; fewer samples are just noise
+MIN_WINDOW_SECONDS = 60
+MIN_WINDOW_SAMPLES = 20
+
+class TelemetryBuffer:
+    """Fixed-size ring buffer of telemetry samples in one NumPy array.
+
+    Memory is allocated once (capacity x len(FIELDS) float64s), so hours of
+    history cost the same as the first minute. Queries work on a trailing
+    time window: mean, percentile and slope per minute of any field. Windows
+    are measured on a monotonic clock stamped at append, so a wall clock
+    change never reorders or drops samples; the "time" field is wall time
+    for the exports only.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.full((capacity, len(FIELDS)), np.nan)
+        self._mono = np.full(capacity, np.nan)
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, sample, mono=None):
+        """Stores a dict of field -> value; absent or None fields are NaN. `mono` defaults to time.monotonic()."""
+        row = [sample.get(name) for name in FIELDS]
+        row = np.array([np.nan if v is None else v for v in row], dtype=float)
+        with self._lock:
+            self._data[self._next] = row
+            self._mono[self._next] = time.monotonic() if mono is None else mono
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def _window(self, seconds=None):
+        """(monotonic stamps, rows) in time order, limited to the last `seconds` if given.
+
+        Only the rows inside the window are copied.
+        """
+        with self._lock:
+            oldest = self._next if self._count == self.capacity else 0
+            order = (oldest + np.arange(self._count)) % self.capacity
+            mono = self._mono[order]
+            start = 0
+            if seconds is not None and len(mono):
+                # Stamps are monotonic in the buffer, so the window starts at one binary search
+                start = int(np.searchsorted(mono, mono[-1] - seconds, side="left"))
+            return mono[start:], self._data[order[start:]]
+
+    def rows(self, seconds=None):
+        """Copy of the samples in time order, limited to the last `seconds` if given."""
+        return self._window(seconds)[1]
+
+    def _column(self, field, seconds):
+        """(monotonic stamps, values) of a field's valid samples in the window."""
+        times, rows = self._window(seconds)
+        values = rows[:, COLUMN[field]]
+        valid = ~np.isnan(values)
+        return times[valid], values[valid]
+
+    @staticmethod
+    def _slope(times, values, min_span):
+        if len(values) < 2 or times[-1] - times[0] < max(min_span, 1e-9):
+            return None
+        t = (times - times.mean()) / 60.0
+        return float((t * (values - values.mean())).sum() / (t * t).sum())
+
+    def mean(self, field, seconds=None):
+        _, values = self._column(field, seconds)
+        return float(values.mean()) if len(values) else None
+
+    def percentile(self, field, q, seconds=None):
+        _, values = self._column(field, seconds)
+        return float(np.percentile(values, q)) if len(values) else None
+
+    def slope(self, field, seconds=None, min_span=MIN_WINDOW_SECONDS):
+        """Least-squares trend of a field in units per minute; None until the samples span min_span seconds."""
+        return self._slope(*self._column(field, seconds), min_span)
+
+    def coverage(self, field, seconds=None):
+        """(valid samples, seconds they span) of a field in the window."""
+        times, _ = self._column(field, seconds)
+        return len(times), float(times[-1] - times[0]) if len(times) else 0.0
+
+    def summary(self, field, seconds=None, min_span=MIN_WINDOW_SECONDS, min_samples=MIN_WINDOW_SAMPLES):
+        """Mean, p95 and slope of a field from one window slice; all None while it holds too little history."""
+        times, values = self._column(field, seconds)
+        span = float(times[-1] - times[0]) if len(times) else 0.0
+        if len(values) < min_samples or span < min_span:
+            return {"mean": None, "p95": None, "slope": None}
+        return {"mean": float(values.mean()), "p95": float(np.percentile(values, 95)),
+                "slope": self._slope(times, values, min_span)}
+
+    def to_csv(self, path, seconds=None):
+        rows = self.rows(seconds)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fmt = ["%.3f"] + ["%.6g"] * (len(FIELDS) - 1)
+        np.savetxt(path, rows, delimiter=",", header=",".join(FIELDS), comments="", fmt=fmt)
+        return path
+
+    def to_parquet(self, path, seconds=None):
+        """Needs pandas with pyarrow or fastparquet installed."""
+        import pandas as pd
+        frame = pd.DataFrame(self.rows(seconds), columns=FIELDS)
+        frame["time"] = pd.to_datetime(frame["time"], unit="s")
+        frame.to_parquet(path, index=False)
+        return path
+
+def history_capacity(interval, hours=TelemetryHistoryHours):
+    return max(1, int(hours * 3600 / interval))
+
+class RateCounter:
+    """Turns a pair of cumulative byte counters into per-second rates between samples."""
+
+    def __init__(self):
+        self._last = None
+
+    def update(self, totals):
+        now = time.monotonic()
+        last, self._last = self._last, ((now, totals) if totals is not None else None)
+        if last is None or totals is None or now <= last[0]:
+            return None, None
+        elapsed = now - last[0]
+        # A counter that went backwards (device removed, wrap) gives no rate
+        return tuple((b - a) / elapsed if b >= a else None for a, b in zip(last[1], totals))
@@ -1,10 +1,21 @@
-import pygame
 import random
 import asyncio
 import edge_tts
 import os
+import re
+import queue
+import tempfile
+import threading
 from dotenv import dotenv_values
-import requests  # For network check
+
+from Backend.AudioOutput import audio_output
+from Backend.Connectivity import connectivity
+
+# Offline fallback voice (system speech engine)
+try:
+    import pyttsx3
+except ImportError:
+    pyttsx3 = None
 
 # Load environment variables from a .env file
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -12,83 +23,193 @@ env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
 AssistantVoice = env_vars.get("AssistantVoice", "en-CA-LiamNeural")  # Default voice
 print(f"Loaded AssistantVoice: {AssistantVoice}")
 
-# Ensure Data directory exists
-DATA_DIR = os.path.join(ROOT_DIR, "Data")
-os.makedirs(DATA_DIR, exist_ok=True)
-
 # Global event loop to manage asyncio
 loop = asyncio.new_event_loop()
 asyncio.set_event_loop(loop)
 
-# Check internet connectivity
-def check_internet():
-    try:
-        requests.get("https://www.google.com", timeout=5)
-        return True
-    except requests.ConnectionError:
-        print("No internet connection. Please connect and retry.")
-        return False
-
-# Asynchronous function to convert text to an audio file
-async def text_to_audio(text):
-    file_path = os.path.join(DATA_DIR, "speech.mp3")
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-            print(f"Removed existing file: {file_path}")
-        except OSError as e:
-            print(f"Error removing file: {e}")
+# Asynchronous function to convert text to MP3 bytes in memory
+async def synthesize(text):
+    """Returns the MP3 bytes for the text without touching the disk."""
     if not isinstance(AssistantVoice, str) or not AssistantVoice:
         raise ValueError(f"Invalid AssistantVoice: {AssistantVoice}")
+    audio = bytearray()
+    async for chunk in edge_tts.Communicate(text, AssistantVoice).stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    if not audio:
+        raise RuntimeError("Audio generation returned no data.")
+    return bytes(audio)
+
+offline_lock = threading.Lock()
+offline_engine = None
+
+def synthesize_offline(text):
+    """Offline fallback: renders WAV bytes with the system voice through pyttsx3."""
+    global offline_engine
+    if pyttsx3 is None:
+        raise RuntimeError("No network and no offline voice installed (pip install pyttsx3).")
+    with offline_lock:
+        if offline_engine is None:
+            offline_engine = pyttsx3.init()
+        # pyttsx3 can only render to a file, so this path uses a short-lived temp file
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            offline_engine.save_to_file(text, path)
+            offline_engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+def render_speech(text, event_loop=None):
+    """Returns encoded audio for the text: edge-tts when it answers, the offline voice otherwise.
+
+    edge-tts is tried even while the monitor reports the network down, since the
+    probe can be wrong; the outcome is reported back to the monitor either way.
+    """
     try:
-        print(f"Attempting to generate audio with text: {text}")
-        communicate = edge_tts.Communicate(text, AssistantVoice)
-        await communicate.save(file_path)
-        if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-            print(f"Successfully generated audio file: {file_path} (size: {os.path.getsize(file_path)} bytes)")
-        else:
-            raise RuntimeError(f"Audio file generation failed. File exists: {os.path.exists(file_path)}, Size: {os.path.getsize(file_path) if os.path.exists(file_path) else 0} bytes")
+        audio = (event_loop or loop).run_until_complete(synthesize(text))
     except Exception as e:
-        print(f"Error in text_to_audio: {e}")
-        raise
+        print(f"Online speech failed, using offline voice: {e}")
+        if isinstance(e, (OSError, asyncio.TimeoutError)):
+            connectivity.report_failure()
+        return synthesize_offline(text)
+    connectivity.report_success()
+    return audio
+
+def stop_speaking():
+    """Barge-in: cuts off whatever is being said and drops queued speech."""
+    audio_output.cancel()
 
 def tts(text, func=lambda: True):
     global loop
     try:
-        if not check_internet():
-            raise ConnectionError("Internet is required for audio generation.")
-        loop.run_until_complete(text_to_audio(text))
-        file_path = os.path.join(DATA_DIR, "speech.mp3")
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Audio file not found: {file_path}")
+        utterance = audio_output.play(render_speech(text))
+        print("Queued audio for playback")
         
-        pygame.mixer.init()
-        print("Pygame mixer initialized")
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play()
-        print("Started playing audio")
-        
-        while pygame.mixer.music.get_busy():
+        while not utterance.wait(0.01):
             if not func():
+                stop_speaking()
                 break
-            pygame.time.wait(10)
-        
-        # Wait for playback to complete
-        pygame.time.wait(2000)
-        pygame.mixer.quit()
-        
-        # Delete the file
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                print(f"Deleted file: {file_path}")
-            except OSError as e:
-                print(f"Error deleting file: {e}")
+        if utterance.error is not None:
+            raise utterance.error
         return True
     except Exception as e:
         print(f"Error in tts: {e}")
         return False
 
+# Lines spoken when a streamed answer is cut short
+ChatScreenResponses = [
+    "The rest of the result has been printed to the chat screen, kindly check it out sir.",
+    "The rest of the answer is now on the chat screen, sir.",
+    "Sir, please check the chat screen for more information.",
+    "You'll find the complete answer on the chat screen, sir.",
+]
+
+# Sentence end: terminal punctuation followed by whitespace, or a line break
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+MIN_SENTENCE_CHARS = 20  # Shorter fragments are merged with the next sentence
+
+class SentenceSplitter:
+    """Turns a stream of text deltas into complete sentences."""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, delta):
+        self.buffer += delta
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.start()].strip()
+            if len(candidate) >= MIN_SENTENCE_CHARS:
+                sentences.append(candidate)
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+class SpeechPipeline:
+    """Speaks an answer while it is still being generated.
+
+    Text deltas are split into sentences; a synthesis thread renders sentence
+    N+1 while the shared audio output service plays sentence N. A barge-in
+    (stop_speaking) silences the pipeline for good.
+    """
+
+    AHEAD = 2  # Clips allowed to wait for playback before synthesis pauses
+
+    def __init__(self, max_sentences=4):
+        self.max_sentences = max_sentences
+        self.splitter = SentenceSplitter()
+        self.sentences = queue.Queue()
+        self.generation = audio_output.generation
+        self.utterances = []
+        self.finished = threading.Event()
+        self.queued = 0
+        self.truncated = False
+        threading.Thread(target=self._synthesis_loop, daemon=True).start()
+
+    def feed(self, delta):
+        for sentence in self.splitter.feed(delta):
+            self._enqueue(sentence)
+
+    def close(self):
+        """Marks the end of the text; remaining audio keeps playing."""
+        for sentence in self.splitter.flush():
+            self._enqueue(sentence)
+        if self.truncated:
+            self.sentences.put(random.choice(ChatScreenResponses))
+        self.sentences.put(None)
+
+    def cancel(self):
+        self.sentences.put(None)
+        stop_speaking()
+
+    def wait(self):
+        """Blocks until everything queued so far has been spoken or cancelled."""
+        self.finished.wait()
+        for utterance in self.utterances:
+            utterance.wait()
+
+    def _cancelled(self):
+        return audio_output.generation != self.generation
+
+    def _enqueue(self, sentence):
+        if self.max_sentences and self.queued >= self.max_sentences:
+            self.truncated = True
+            return
+        self.queued += 1
+        self.sentences.put(sentence)
+
+    def _synthesis_loop(self):
+        synth_loop = asyncio.new_event_loop()
+        try:
+            while not self._cancelled():
+                sentence = self.sentences.get()
+                if sentence is None:
+                    break
+                # Stay only a little ahead of playback
+                pending = [u for u in self.utterances if not u.done.is_set()]
+                while len(pending) >= self.AHEAD and not self._cancelled():
+                    pending[0].wait(0.1)
+                    pending = [u for u in pending if not u.done.is_set()]
+                if audio_output.failed:
+                    break  # No device to play on; do not synthesize the rest
+                try:
+                    data = render_speech(sentence, synth_loop)
+                except Exception as e:
+                    print(f"Error synthesizing sentence: {e}")
+                    continue
+                self.utterances.append(audio_output.play(data, self.generation))
+        finally:
+            self.finished.set()
+            synth_loop.close()
+
 def text_to_speech(text):
     sentences = text.split(".")
     responses = [
@@ -0,0 +1,45 @@
+import re
+import math
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+# Common filler words that carry no retrieval signal
+STOPWORDS = frozenset({
+    "a", "an", "the", "and", "or", "but", "if", "then", "so", "of", "to", "in", "on", "at", "by",
+    "for", "with", "from", "as", "is", "are", "was", "were", "be", "been", "am", "do", "does", "did",
+    "it", "its", "this", "that", "these", "those", "i", "me", "my", "you", "your", "he", "she", "we",
+    "they", "them", "his", "her", "our", "their", "what", "where", "when", "who", "how", "why",
+    "which", "tell", "about", "can", "could", "would", "should", "will", "please", "sir", "just",
+    "not", "no", "yes", "there", "here", "have", "has", "had", "some", "any", "all", "into", "up",
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    """Lowercases text and returns its content words, in order."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+def count_tokens(text):
+    """Token count of a string; a 4-characters-per-token estimate when tiktoken is absent."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+def truncate_to_tokens(text, max_tokens):
+    """Cuts text to roughly max_tokens, preferring a line or sentence boundary."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        cut = _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[:max_tokens * 4]
+    boundary = max(cut.rfind("\n"), cut.rfind(". "))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + " ..."
@@ -0,0 +1,326 @@
+import re
+import calendar
+import datetime
+
+# Rule-based parser for reminder phrases such as
+#   "9:00pm 25th june business meeting", "call mom in 20 minutes",
+#   "every monday and thursday at 7am gym", "standup cron 30 9 * * 1-5".
+# Every rule is a pre-compiled regex; a matched span is removed from the text
+# and whatever is left over becomes the reminder message.
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+                "seven": 7, "eight": 8, "nine": 9, "ten": 10, "fifteen": 15, "twenty": 20,
+                "thirty": 30, "forty five": 45, "half an": 0.5, "half a": 0.5, "other": 2}
+UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400, "week": 604800}
+NAMED_TIMES = {"noon": (12, 0), "midday": (12, 0), "midnight": (0, 0), "morning": (9, 0),
+               "afternoon": (14, 0), "evening": (18, 0), "tonight": (20, 0)}
+DEFAULT_TIME = (9, 0)  # For a date without a time
+
+_WD = r"(?:mon|tue|tues|wed|thu|thur|thurs|fri|sat|sun)(?:day|nesday|sday|urday|rsday)?"
+# Dates need the full day name; "sun", "wed" etc. are too often ordinary words
+_WD_FULL = r"(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+_MON = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+_NUM = r"(\d+|half an?|forty five|other|an?|one|two|three|four|five|six|seven|eight|nine|ten|fifteen|twenty|thirty)"
+_UNIT = r"(sec|second|min|minute|hr|hour|day|week)s?"
+
+RE_FILLER = re.compile(r"^\s*(?:please\s+)?(?:set\s+(?:up\s+)?(?:a|an|the|my)?\s*)?(?:reminder|remind\s+me)\b(?:\s+(?:to|about|for|that|of)\b)?", re.I)
+RE_CRON = re.compile(r"\bcron\s+((?:\S+\s+){4}\S+)", re.I)
+RE_EVERY_INTERVAL = re.compile(r"\bevery\s+(?:" + _NUM + r"\s+)?(minute|min|hour|hr|day|week|month)s?\b", re.I)
+RE_EVERY_NAMED = re.compile(r"\b(daily|hourly|weekly|monthly|every\s+weekday|every\s+weekend|every\s+day|every\s+night)\b", re.I)
+RE_EVERY_WEEKDAYS = re.compile(r"\bevery\s+(" + _WD + r"(?:\s*(?:,|and|&)\s*" + _WD + r")*)\b", re.I)
+RE_RELATIVE = re.compile(r"\b(?:in|after)\s+" + _NUM + r"\s*" + _UNIT + r"(?:\s*(?:and|,)?\s*(\d+)\s*" + _UNIT + r")?\b", re.I)
+RE_TIME_AMPM = re.compile(r"\b(?:at\s+)?(1[0-2]|0?[1-9])(?:[:.]([0-5]\d))?\s*(a\.?m\.?|p\.?m\.?)(?=\W|$)", re.I)
+RE_TIME_24H = re.compile(r"\b(?:at\s+)?([01]?\d|2[0-3]):([0-5]\d)\b", re.I)
+RE_TIME_AT_HOUR = re.compile(r"\bat\s+([01]?\d|2[0-3])(?:\s+([0-5]\d))?\b(?!\s*(?:st|nd|rd|th|" + _MON + r"))", re.I)
+RE_TIME_NAMED = re.compile(r"\b(?:at\s+|in\s+the\s+|this\s+)?(noon|midday|midnight|morning|afternoon|evening|tonight)\b", re.I)
+RE_DATE_ISO = re.compile(r"\b(?:on\s+)?(\d{4})-(\d{1,2})-(\d{1,2})\b")
+RE_DATE_DAY_MONTH = re.compile(r"\b(?:on\s+)?(?:the\s+)?(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(" + _MON + r")\b(?:\s+(\d{4}))?", re.I)
+RE_DATE_MONTH_DAY = re.compile(r"\b(?:on\s+)?(" + _MON + r")\s+(\d{1,2})(?:st|nd|rd|th)?\b(?:,?\s+(\d{4}))?", re.I)
+RE_DATE_RELATIVE = re.compile(r"\b(day after tomorrow|tomorrow|today)\b", re.I)
+RE_DATE_WEEKDAY = re.compile(r"\b(?:on\s+|next\s+|this\s+)?(" + _WD_FULL + r")\b", re.I)
+RE_LEADING_JUNK = re.compile(r"^(?:to|for|about|that|on|at|of|me)\s+", re.I)
+
+class ReminderParseError(ValueError):
+    pass
+
+def _number(token):
+    token = token.lower()
+    return float(token) if token[0].isdigit() else NUMBER_WORDS.get(token, 1)
+
+def _unit_seconds(unit):
+    unit = unit.lower()
+    for name, seconds in UNIT_SECONDS.items():
+        if name.startswith(unit) or unit.startswith(name[:3]):
+            return seconds
+    return 60
+
+def _weekday(name):
+    name = name.lower()
+    return next(i for i, day in enumerate(WEEKDAYS) if name.startswith(day[:3]))
+
+def _month(name):
+    name = name.lower()
+    return next(i + 1 for i, month in enumerate(MONTHS) if name.startswith(month[:3]))
+
+def _add_months(moment, months):
+    month = moment.month - 1 + months
+    year = moment.year + month // 12
+    month = month % 12 + 1
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+# --- Cron expressions -------------------------------------------------------
+
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+def _cron_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/")
+            step = int(step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-"))
+        else:
+            start = end = int(part)
+        values.update(range(start, end + 1, step))
+    if not values or min(values) < low or max(values) > high + (1 if high == 6 else 0):
+        raise ReminderParseError(f"Invalid cron field '{field}'")
+    return values
+
+def parse_cron(expr):
+    """Parses "minute hour day-of-month month day-of-week" (cron weekday 0 or 7 = Sunday)."""
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ReminderParseError("A cron rule needs five fields")
+    minutes, hours, days, months, weekdays = (_cron_field(f, *r) for f, r in zip(fields, CRON_RANGES))
+    # Convert cron weekdays (0 = Sunday) to Python's (0 = Monday)
+    weekdays = {(d - 1) % 7 for d in weekdays}
+    return {"minutes": sorted(minutes), "hours": sorted(hours), "days": days, "months": months,
+            "weekdays": weekdays, "any_day": fields[2] == "*", "any_weekday": fields[4] == "*"}
+
+def _cron_next(expr, after):
+    rule = parse_cron(expr)
+    day = after.date()
+    for _ in range(366 * 5):
+        if day.month in rule["months"]:
+            dom = day.day in rule["days"]
+            dow = day.weekday() in rule["weekdays"]
+            # Standard cron: when both are restricted either one may match
+            if rule["any_day"] or rule["any_weekday"]:
+                matches = dom and dow
+            else:
+                matches = dom or dow
+            if matches:
+                for hour in rule["hours"]:
+                    for minute in rule["minutes"]:
+                        candidate = datetime.datetime.combine(day, datetime.time(hour, minute))
+                        if candidate > after:
+                            return candidate
+        day += datetime.timedelta(days=1)
+    return None
+
+# --- Recurrence rules ---------------------------------------------------------
+
+def next_occurrence(rule, after):
+    """First occurrence of a recurrence rule strictly after `after` (a datetime).
+
+    Rules are small JSON-able dicts, so a recurring task stores one rule and
+    one next due time instead of a list of occurrences:
+      {"kind": "interval", "every": n, "unit": "minute|hour|day|week|month", "anchor": timestamp}
+      {"kind": "weekly", "days": [0..6], "at": "HH:MM"}
+      {"kind": "cron", "expr": "m h dom mon dow"}
+    """
+    kind = rule["kind"]
+    if kind == "interval":
+        anchor = datetime.datetime.fromtimestamp(rule["anchor"])
+        if rule["unit"] == "month":
+            months = max(0, (after.year - anchor.year) * 12 + after.month - anchor.month - 1)
+            months -= months % rule["every"]
+            candidate = _add_months(anchor, months)
+            while candidate <= after:
+                months += rule["every"]
+                candidate = _add_months(anchor, months)
+            return candidate
+        step = rule["every"] * UNIT_SECONDS[rule["unit"]]
+        if after < anchor:
+            return anchor
+        periods = int((after - anchor).total_seconds() // step) + 1
+        return anchor + datetime.timedelta(seconds=periods * step)
+    if kind == "weekly":
+        hour, minute = (int(x) for x in rule["at"].split(":"))
+        day = after.date()
+        for offset in range(8):
+            candidate = datetime.datetime.combine(day + datetime.timedelta(days=offset), datetime.time(hour, minute))
+            if candidate.weekday() in rule["days"] and candidate > after:
+                return candidate
+        return None
+    if kind == "cron":
+        return _cron_next(rule["expr"], after)
+    raise ReminderParseError(f"Unknown recurrence kind '{kind}'")
+
+def describe_rule(rule):
+    if rule["kind"] == "interval":
+        unit = rule["unit"] + ("s" if rule["every"] != 1 else "")
+        return f"every {rule['every']} {unit}" if rule["every"] != 1 else f"every {rule['unit']}"
+    if rule["kind"] == "weekly":
+        return "every " + ", ".join(WEEKDAYS[d].capitalize() for d in sorted(rule["days"])) + f" at {rule['at']}"
+    return f"cron {rule['expr']}"
+
+# --- Phrase parsing ----------------------------------------------------------------
+
+class _Text:
+    """Lets rules consume matched spans; the remainder is the reminder message."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def take(self, pattern):
+        match = pattern.search(self.text)
+        if match:
+            self.text = (self.text[:match.start()] + " " + self.text[match.end():]).strip()
+        return match
+
+def _resolve_date(when, now, explicit_year):
+    """Moves a date without an explicit year into the future."""
+    if when.date() < now.date() and not explicit_year:
+        try:
+            return when.replace(year=when.year + 1)
+        except ValueError:  # 29th of February
+            return when.replace(year=when.year + 1, day=28)
+    return when
+
+def parse_reminder(text, now=None):
+    """Parses a reminder phrase.
+
+    Returns (message, due datetime, recurrence rule or None). Raises
+    ReminderParseError when no time can be found.
+    """
+    # Full precision: a relative reminder must never fire before its offset has passed
+    now = now or datetime.datetime.now()
+    rest = _Text(RE_FILLER.sub("", text, count=1).strip())
+
+    # Recurrence
+    rule = None
+    match = rest.take(RE_CRON)
+    if match:
+        parse_cron(match.group(1))  # Validate now rather than at fire time
+        rule = {"kind": "cron", "expr": match.group(1).strip()}
+    weekdays = None
+    if rule is None:
+        match = rest.take(RE_EVERY_NAMED)
+        if match:
+            word = match.group(1).lower().split()[-1]
+            if word in ("daily", "day", "night"):
+                rule = {"kind": "interval", "every": 1, "unit": "day"}
+            elif word == "hourly":
+                rule = {"kind": "interval", "every": 1, "unit": "hour"}
+            elif word == "weekly":
+                rule = {"kind": "interval", "every": 1, "unit": "week"}
+            elif word == "monthly":
+                rule = {"kind": "interval", "every": 1, "unit": "month"}
+            else:
+                weekdays = [0, 1, 2, 3, 4] if word == "weekday" else [5, 6]
+    if rule is None and weekdays is None:
+        match = rest.take(RE_EVERY_WEEKDAYS)
+        if match:
+            weekdays = sorted({_weekday(d) for d in re.findall(_WD, match.group(1), re.I)})
+        else:
+            match = rest.take(RE_EVERY_INTERVAL)
+            if match:
+                every = int(_number(match.group(1))) if match.group(1) else 1
+                unit = match.group(2).lower()
+                unit = {"min": "minute", "hr": "hour"}.get(unit, unit)
+                rule = {"kind": "interval", "every": max(every, 1), "unit": unit}
+
+    # Relative offset ("in 20 minutes", "after 1 hour and 30 minutes")
+    due = None
+    match = rest.take(RE_RELATIVE)
+    if match:
+        seconds = _number(match.group(1)) * _unit_seconds(match.group(2))
+        if match.group(3):
+            seconds += int(match.group(3)) * _unit_seconds(match.group(4))
+        due = now + datetime.timedelta(seconds=seconds)
+
+    # Time of day
+    clock = None
+    match = rest.take(RE_TIME_AMPM)
+    if match:
+        hour, minute = int(match.group(1)) % 12, int(match.group(2) or 0)
+        if match.group(3).lower().startswith("p"):
+            hour += 12
+        clock = (hour, minute)
+    else:
+        match = rest.take(RE_TIME_24H) or rest.take(RE_TIME_AT_HOUR)
+        if match:
+            clock = (int(match.group(1)), int(match.group(2) or 0))
+        else:
+            match = rest.take(RE_TIME_NAMED)
+            if match:
+                clock = NAMED_TIMES[match.group(1).lower()]
+
+    # Date
+    date, explicit_year, weekday = None, False, None
+    match = rest.take(RE_DATE_ISO)
+    if match:
+        date, explicit_year = datetime.date(int(match.group(1)), int(match.group(2)), int(match.group(3))), True
+    else:
+        match = rest.take(RE_DATE_DAY_MONTH)
+        if match:
+            year = int(match.group(3)) if match.group(3) else now.year
+            date, explicit_year = datetime.date(year, _month(match.group(2)), int(match.group(1))), bool(match.group(3))
+        else:
+            match = rest.take(RE_DATE_MONTH_DAY)
+            if match:
+                year = int(match.group(3)) if match.group(3) else now.year
+                date, explicit_year = datetime.date(year, _month(match.group(1)), int(match.group(2))), bool(match.group(3))
+            else:
+                match = rest.take(RE_DATE_RELATIVE)
+                if match:
+                    word = match.group(1).lower()
+                    date = now.date() + datetime.timedelta(days={"today": 0, "tomorrow": 1}.get(word, 2))
+                else:
+                    match = rest.take(RE_DATE_WEEKDAY)
+                    if match:
+                        weekday = _weekday(match.group(1))
+
+    message = RE_LEADING_JUNK.sub("", re.sub(r"\s+", " ", rest.text).strip(" ,.-")).strip(" ,.-")
+    message = message or "Reminder"
+
+    if weekdays is not None:
+        rule = {"kind": "weekly", "days": weekdays, "at": "%02d:%02d" % (clock or DEFAULT_TIME)}
+        return message, next_occurrence(rule, now), rule
+
+    if due is None:
+        if clock is None and date is None and weekday is None:
+            if rule is None:
+                raise ReminderParseError(f"Could not find a time in '{text}'")
+            # "every 2 hours": first occurrence one period from now
+            due = now
+        else:
+            hour, minute = clock or DEFAULT_TIME
+            if date is not None:
+                due = _resolve_date(datetime.datetime.combine(date, datetime.time(hour, minute)), now, explicit_year)
+            else:
+                due = datetime.datetime.combine(now.date(), datetime.time(hour, minute))
+                if weekday is not None:
+                    due += datetime.timedelta(days=(weekday - now.weekday()) % 7)
+                    if due <= now:
+                        due += datetime.timedelta(days=7)
+                elif due <= now:
+                    due += datetime.timedelta(days=1)  # A time that already passed today means tomorrow
+
+    if rule is not None and rule["kind"] == "interval":
+        rule["anchor"] = due.timestamp()
+        if due <= now:
+            due = next_occurrence(rule, now)
+            rule["anchor"] = due.timestamp()
+    elif rule is not None:
+        due = next_occurrence(rule, now)
+    return message, due, rule
@@ -0,0 +1,114 @@
+import os
+import numpy as np
+from dotenv import dotenv_values
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
+VADHangoverMs = int(env_vars.get("VADHangoverMs", 400))   # Silence that ends an utterance
+VADPreRollMs = int(env_vars.get("VADPreRollMs", 300))     # Audio kept from before speech onset
+VADMarginDb = float(env_vars.get("VADMarginDb", 9))       # Required level above the noise floor
+
+RATE = 16000
+FRAME_MS = 30
+MIN_SPEECH_MS = 90      # Onset needs this much consecutive speech (rejects clicks)
+FLOOR_RISE = 0.02       # Noise floor adapts slowly upwards...
+FLOOR_FALL = 0.3        # ...and quickly downwards
+FLOOR_INIT_DB = -60.0
+FLOOR_MIN_DB = -90.0
+
+def frame_features(frame):
+    """Energy (dBFS) and zero-crossing rate of one int16 frame, computed in float."""
+    x = frame.astype(np.float32) / 32768.0
+    energy_db = 10.0 * np.log10(float(np.dot(x, x)) / len(x) + 1e-10)
+    signs = np.signbit(x)
+    zcr = float(np.count_nonzero(signs[1:] != signs[:-1])) / (len(x) - 1)
+    return energy_db, zcr
+
+class VoiceActivityDetector:
+    """Frame classifier with an adaptive noise floor.
+
+    A frame is speech when its energy clears the floor by margin_db; quieter
+    frames still count if their zero-crossing rate looks like a fricative.
+    The floor follows the background level only on non-speech frames.
+    """
+
+    def __init__(self, margin_db=VADMarginDb):
+        self.margin_db = margin_db
+        self.floor_db = FLOOR_INIT_DB
+        self._calibrated = False
+
+    def is_speech(self, frame):
+        energy_db, zcr = frame_features(frame)
+        if not self._calibrated:
+            self.floor_db = max(energy_db, FLOOR_MIN_DB)
+            self._calibrated = True
+            return False
+        above = energy_db - self.floor_db
+        speech = above > self.margin_db or (above > self.margin_db / 2 and 0.15 < zcr < 0.5)
+        if not speech:
+            rate = FLOOR_RISE if energy_db > self.floor_db else FLOOR_FALL
+            self.floor_db = max(self.floor_db + rate * (energy_db - self.floor_db), FLOOR_MIN_DB)
+        return speech
+
+class Endpointer:
+    """Finds where an utterance starts and ends in a stream of samples.
+
+    Positions are absolute sample indices (the capture cursor), so the caller
+    can cut [start - pre-roll, end) straight out of the microphone ring buffer.
+    """
+
+    def __init__(self, vad, rate=RATE, hangover_ms=VADHangoverMs, preroll_ms=VADPreRollMs):
+        self.vad = vad
+        self.frame = rate * FRAME_MS // 1000
+        self.hangover_frames = max(1, hangover_ms // FRAME_MS)
+        self.onset_frames = max(1, MIN_SPEECH_MS // FRAME_MS)
+        self.preroll = rate * preroll_ms // 1000
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._pending_pos = None
+        self._run = 0        # Consecutive speech frames before onset
+        self._silence = 0    # Consecutive non-speech frames after onset
+        self.start = None    # First sample of speech (without pre-roll)
+        self.end = None      # First sample after speech
+
+    @property
+    def started(self):
+        return self.start is not None
+
+    @property
+    def ended(self):
+        return self.end is not None
+
+    @property
+    def audio_start(self):
+        """Start of the utterance including pre-roll."""
+        return max(0, self.start - self.preroll)
+
+    def feed(self, samples, position):
+        """Feeds samples that begin at absolute index `position`; returns True once the utterance ended."""
+        if self.ended:
+            return True
+        if self._pending_pos is None or not len(self._pending):
+            self._pending_pos = position
+            self._pending = samples
+        else:
+            self._pending = np.concatenate([self._pending, samples])
+
+        offset = 0
+        while len(self._pending) - offset >= self.frame and not self.ended:
+            frame_pos = self._pending_pos + offset
+            speech = self.vad.is_speech(self._pending[offset:offset + self.frame])
+            offset += self.frame
+            if not self.started:
+                self._run = self._run + 1 if speech else 0
+                if self._run >= self.onset_frames:
+                    self.start = frame_pos - (self._run - 1) * self.frame
+            elif speech:
+                self._silence = 0
+            else:
+                self._silence += 1
+                if self._silence >= self.hangover_frames:
+                    # Endpoint right after the last speech frame
+                    self.end = frame_pos + self.frame - self._silence * self.frame
+        self._pending = self._pending[offset:]
+        self._pending_pos += offset
+        return self.ended
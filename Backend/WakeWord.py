@@ -0,0 +1,164 @@
+import os
+import threading
+import logging
+import numpy as np
+from dotenv import dotenv_values
+
+from Backend.Storage import DATA_DIR
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+env_vars = dotenv_values(os.path.join(ROOT_DIR, '.env'))
+WakeWordSensitivity = float(env_vars.get("WakeWordSensitivity", 1.3))  # Higher accepts looser matches
+
+TEMPLATES_PATH = os.path.join(DATA_DIR, "WakeWord.npz")
+RATE = 16000
+FRAME_LEN = 400        # 25 ms analysis window
+FRAME_STEP = 160       # 10 ms hop
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+MIN_TEMPLATES = 3      # Whisper confirms the wake word until this many samples are enrolled
+MAX_TEMPLATES = 8
+DEFAULT_THRESHOLD = 12.0  # Used until two templates allow calibration
+
+def _mel_filterbank(n_mels=N_MELS, n_fft=N_FFT, rate=RATE):
+    mel = lambda f: 2595.0 * np.log10(1.0 + f / 700.0)
+    hz = lambda m: 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+    points = hz(np.linspace(mel(0), mel(rate / 2), n_mels + 2))
+    bins = np.floor((n_fft + 1) * points / rate).astype(int)
+    bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, centre, right = bins[m - 1], bins[m], bins[m + 1]
+        if centre > left:
+            bank[m - 1, left:centre] = (np.arange(left, centre) - left) / (centre - left)
+        if right > centre:
+            bank[m - 1, centre:right] = (right - np.arange(centre, right)) / (right - centre)
+    return bank
+
+def _dct_matrix(n_out=N_MFCC, n_in=N_MELS):
+    k = np.arange(n_out)[:, None]
+    n = np.arange(n_in)[None, :]
+    return (np.cos(np.pi * k * (2 * n + 1) / (2 * n_in)) * np.sqrt(2.0 / n_in)).astype(np.float32)
+
+_MEL_BANK = _mel_filterbank()
+_DCT = _dct_matrix()
+_WINDOW = np.hamming(FRAME_LEN).astype(np.float32)
+
+def mfcc(samples):
+    """MFCC frames (n_frames x 12) of int16 audio, cepstral-mean normalised; c0 is dropped."""
+    x = samples.astype(np.float32) / 32768.0
+    if len(x) < FRAME_LEN:
+        return np.zeros((0, N_MFCC - 1), dtype=np.float32)
+    x = np.append(x[0], x[1:] - 0.97 * x[:-1])  # Pre-emphasis
+    n_frames = 1 + (len(x) - FRAME_LEN) // FRAME_STEP
+    idx = np.arange(FRAME_LEN)[None, :] + FRAME_STEP * np.arange(n_frames)[:, None]
+    power = np.abs(np.fft.rfft(x[idx] * _WINDOW, N_FFT)) ** 2 / N_FFT
+    feats = np.log(power @ _MEL_BANK.T + 1e-10) @ _DCT.T
+    feats = feats[:, 1:]  # c0 is loudness only
+    return feats - feats.mean(axis=0)
+
+def dtw_distance(template, segment):
+    """Subsequence DTW: best match of the whole template anywhere inside segment.
+
+    Steps are restricted to (1,1), (1,0) and (1,2) so each template row only
+    depends on the previous one and is computed as one vector operation; this
+    allows the segment to run between half and twice the template's speed.
+    """
+    if not len(template) or len(segment) < 2:
+        return np.inf
+    cost = np.sqrt(((template[:, None, :] - segment[None, :, :]) ** 2).sum(axis=2))
+    acc = cost[0].copy()  # Free start anywhere in the segment
+    for i in range(1, len(template)):
+        prev = acc
+        best = prev.copy()                              # (1,0): segment waits
+        np.minimum(best[1:], prev[:-1], out=best[1:])    # (1,1): diagonal
+        np.minimum(best[2:], prev[:-2], out=best[2:])    # (1,2): segment skips a frame
+        acc = cost[i] + best
+    return float(acc.min()) / len(template)
+
+class WakeWordDetector:
+    """Keyword spotter that matches MFCC templates of the user saying the wake word.
+
+    Templates are enrolled automatically: while fewer than MIN_TEMPLATES exist,
+    short utterances are confirmed by Whisper and added when they contain the
+    wake word. Afterwards only DTW runs, which costs a few milliseconds per
+    utterance, and Whisper is reserved for the command that follows.
+    """
+
+    def __init__(self, wake_word, path=TEMPLATES_PATH, sensitivity=WakeWordSensitivity):
+        self.wake_word = wake_word.lower()
+        self.path = path
+        self.sensitivity = sensitivity
+        self.templates = []
+        self._lock = threading.Lock()
+        self._threshold = DEFAULT_THRESHOLD
+        self._load()
+
+    @property
+    def ready(self):
+        return len(self.templates) >= MIN_TEMPLATES
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                if str(data["word"]) != self.wake_word:
+                    return  # Assistant was renamed; enroll again
+                self.templates = [data[f"t{i}"] for i in range(int(data["count"]))]
+            self._calibrate()
+        except Exception as e:
+            logging.error(f"Failed to load wake word templates: {e}")
+
+    def _save(self):
+        arrays = {f"t{i}": t for i, t in enumerate(self.templates)}
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(tmp_path, word=self.wake_word, count=len(self.templates), **arrays)
+        os.replace(tmp_path, self.path)
+
+    def _calibrate(self):
+        """Threshold = typical distance between enrolled samples, scaled by sensitivity."""
+        if len(self.templates) < 2:
+            self._threshold = DEFAULT_THRESHOLD
+            return
+        distances = [dtw_distance(a, b) for i, a in enumerate(self.templates)
+                     for j, b in enumerate(self.templates) if i != j]
+        self._threshold = float(np.median(distances)) * self.sensitivity
+
+    @staticmethod
+    def _trim(samples):
+        """Drops the quiet pre-roll and tail so templates hold only the spoken word."""
+        frames = len(samples) // FRAME_STEP
+        if frames < 3:
+            return samples
+        x = samples[:frames * FRAME_STEP].astype(np.float32).reshape(frames, FRAME_STEP)
+        energy_db = 10.0 * np.log10((x * x).mean(axis=1) + 1e-10)
+        loud = np.flatnonzero(energy_db > energy_db.max() - 30.0)
+        return samples[loud[0] * FRAME_STEP:(loud[-1] + 1) * FRAME_STEP]
+
+    def enroll(self, samples):
+        feats = mfcc(self._trim(samples))
+        if len(feats) < 10:
+            return
+        with self._lock:
+            self.templates.append(feats)
+            if len(self.templates) > MAX_TEMPLATES:
+                self.templates.pop(0)
+            self._calibrate()
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._save()
+            except OSError as e:
+                logging.error(f"Failed to save wake word templates: {e}")
+
+    def score(self, samples):
+        """Lowest DTW distance between the utterance and any template."""
+        feats = mfcc(self._trim(samples))
+        with self._lock:
+            templates = list(self.templates)
+        if not templates or not len(feats):
+            return np.inf
+        return min(dtw_distance(t, feats) for t in templates)
+
+    def matches(self, samples):
+        return self.score(samples) <= self._threshold
@@ -1,48 +1,226 @@
-import requests
+import os
+import re
+import time
+import codecs
+import threading
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 import trafilatura
 import logging
 
+from Backend.PageCache import page_cache, body_hash, FRESH_SECONDS, STALE_SECONDS
+from Backend.PassageRanker import select_passages
+from Backend.HttpSession import session, POOL_SIZE
+
+MAX_CHARS = 20000          # Extracted text kept per page; passages are ranked from it
+SOURCE_CHARS = 3000        # Limit per site for LLM context when there is no query to rank by
+RESEARCH_SOURCES = 3       # The first N pages that yield text win
+RESEARCH_DEADLINE = 8      # Seconds for the whole research step
+RESEARCH_TOKEN_BUDGET = 1500  # Tokens of ranked passages handed to the LLM
+FETCH_WORKERS = POOL_SIZE
+MAX_DOWNLOAD_BYTES = 1024 * 1024   # Hard cap on bytes read per page
+VISIBLE_TEXT_TARGET = MAX_CHARS * 2  # Enough visible text for extraction to find MAX_CHARS of content
+CHUNK_BYTES = 16 * 1024
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+# Running totals for the streaming fetcher
+fetch_stats = {"requests": 0, "bytes_downloaded": 0, "bytes_saved": 0, "rejected": 0}
+_stats_lock = threading.Lock()
+
+# Network waits and HTML parsing run in separate pools so a slow parse never holds up a download
+fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+extract_pool = ThreadPoolExecutor(max_workers=max(2, (os.cpu_count() or 2) // 2), thread_name_prefix="extract")
+
+class VisibleTextCounter(HTMLParser):
+    """Incremental count of the characters a reader would see (no scripts or styles)."""
+
+    HIDDEN = {"script", "style", "noscript", "template", "svg", "head"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chars = 0
+        self._hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.HIDDEN:
+            self._hidden += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.HIDDEN and self._hidden:
+            self._hidden -= 1
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self.chars += len(data.strip())
+
+def _charset(content_type, head):
+    match = re.search(r"charset=([\w-]+)", content_type, re.I) or _META_CHARSET_RE.search(head)
+    charset = match.group(1) if match else "utf-8"
+    if isinstance(charset, bytes):
+        charset = charset.decode("ascii", "ignore")
+    try:
+        codecs.lookup(charset)
+        return charset
+    except LookupError:
+        return "utf-8"
+
+def _record(downloaded, saved=0, rejected=False):
+    with _stats_lock:
+        fetch_stats["requests"] += 1
+        fetch_stats["bytes_downloaded"] += downloaded
+        fetch_stats["bytes_saved"] += saved
+        fetch_stats["rejected"] += rejected
+
+def fetch_page(url, timeout=10, cached=None):
+    """Streams a page over the shared session; returns (status_code, html, headers).
+
+    Non-HTML responses are refused from their headers (html is None). The
+    body is read in chunks and the download stops at MAX_DOWNLOAD_BYTES or
+    once enough visible text has arrived for extraction, whichever is first.
+    With a cached entry the request is conditional, so an unchanged page
+    comes back as an empty 304.
+    """
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    with session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+        content_type = response.headers.get("Content-Type", "")
+        if response.status_code != 200:
+            _record(0)
+            return response.status_code, "", response.headers
+        if content_type and not content_type.lower().startswith(HTML_TYPES):
+            logging.info(f"Skipping {url}: {content_type}")
+            _record(0, int(response.headers.get("Content-Length") or 0), rejected=True)
+            return response.status_code, None, response.headers
+
+        counter = VisibleTextCounter()
+        decoder = None
+        parts = []
+        downloaded = 0
+        complete = True
+        for chunk in response.iter_content(CHUNK_BYTES):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(_charset(content_type, chunk[:2048]))("replace")
+            text = decoder.decode(chunk)
+            parts.append(text)
+            counter.feed(text)
+            downloaded += len(chunk)
+            if downloaded >= MAX_DOWNLOAD_BYTES or counter.chars >= VISIBLE_TEXT_TARGET:
+                complete = False
+                break
+        # Bytes actually taken off the wire (compressed), comparable with Content-Length
+        wire = response.raw.tell() if hasattr(response.raw, "tell") else downloaded
+
+    saved = 0
+    if not complete:
+        total = int(response.headers.get("Content-Length") or 0)
+        saved = max(0, total - wire)
+        logging.info(f"Stopped {url} after {wire} bytes" + (f", {saved} bytes saved" if total else ""))
+    _record(wire, saved)
+    return response.status_code, "".join(parts), response.headers
+
+def extract_text(html):
+    """Main text of a page: trafilatura first, BeautifulSoup as the fallback."""
+    # Try trafilatura first as it's excellent at removing boilerplate
+    result = trafilatura.extract(html)
+    if result:
+        return result[:MAX_CHARS]
+
+    # Fallback to BeautifulSoup if trafilatura fails
+    soup = BeautifulSoup(html, 'html.parser')
+    # Remove scripts and styles
+    for script in soup(["script", "style"]):
+        script.decompose()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = '\n'.join(chunk for chunk in chunks if chunk)
+    return text[:MAX_CHARS]
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def fetch_cached(url, timeout=10, allow_stale=True):
+    """Cache-aware fetch.
+
+    Returns ("text", text) when stored text can be used, ("html", html, meta)
+    when a new page version must be extracted, or ("error", reason). Fresh
+    entries skip the network; recently stale ones are returned at once and
+    refreshed in the background; anything older is revalidated before it is
+    used (a conditional request, so an unchanged page costs a 304).
+    """
+    entry = page_cache.get(url)
+    if entry and allow_stale:
+        age = time.time() - entry["fetched"]
+        if age < FRESH_SECONDS:
+            return ("text", entry["text"])
+        if age < STALE_SECONDS:
+            with _refreshing_lock:
+                if url not in _refreshing:
+                    _refreshing.add(url)
+                    fetch_pool.submit(_refresh, url)
+            return ("text", entry["text"])
+
+    status, html, headers = fetch_page(url, timeout, entry)
+    if status == 304 and entry:
+        return ("text", page_cache.touch(url, entry)["text"])
+    if html is None:
+        return ("error", f"Content-Type: {headers.get('Content-Type')}")
+    if status != 200 or not html:
+        return ("error", f"Status: {status}")
+    digest = body_hash(html)
+    if entry and entry.get("body_hash") == digest:
+        # Server ignored the validators but the page did not change
+        return ("text", page_cache.touch(url, entry)["text"])
+    meta = {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"), "digest": digest}
+    return ("html", html, meta)
+
+def extract_and_store(url, html, meta):
+    """Extracts a new page version and caches the text."""
+    text = extract_text(html)
+    if text:
+        page_cache.put(url, text, **meta)
+    return text
+
+def _refresh(url):
+    """Stale-while-revalidate: brings a cached page up to date off the request path."""
+    try:
+        result = fetch_cached(url, allow_stale=False)
+        if result[0] == "html":
+            extract_and_store(url, *result[1:])
+    except Exception as e:
+        logging.info(f"Background refresh failed for {url}: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(url)
+
 def scrape_url(url, timeout=10):
     """
     Attempts to extract the main meaningful text from a URL.
     Uses trafilatura for high-quality content extraction.
     """
     try:
-        # Standard headers to avoid bot detection
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=timeout)
-        if response.status_code == 200:
-            # Try trafilatura first as it's excellent at removing boilerplate
-            downloaded = response.text
-            result = trafilatura.extract(downloaded)
-            
-            if result:
-                return result[:3000] # Limit to 3000 chars per site for LLM context
-            
-            # Fallback to BeautifulSoup if trafilatura fails
-            soup = BeautifulSoup(downloaded, 'html.parser')
-            # Remove scripts and styles
-            for script in soup(["script", "style"]):
-                script.decompose()
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            return text[:2000]
-            
-        return f"Failed to retrieve content from {url} (Status: {response.status_code})"
+        result = fetch_cached(url, timeout)
+        if result[0] == "text":
+            return result[1][:SOURCE_CHARS]
+        if result[0] == "html":
+            return extract_and_store(url, *result[1:])[:SOURCE_CHARS]
+        return f"Failed to retrieve content from {url} ({result[1]})"
     except Exception as e:
         return f"Error scraping {url}: {str(e)}"
 
-def research_topic(urls):
-    """Scrapes multiple URLs and returns a consolidated context block."""
+def format_context(sources, query=None, token_budget=RESEARCH_TOKEN_BUDGET):
+    """Builds the "--- Source: url ---" context block from [(url, text)] in rank order."""
+    if query:
+        blocks = [(url, "\n\n".join(passages)) for url, passages in select_passages(query, sources, token_budget)]
+    else:
+        blocks = [(url, text[:SOURCE_CHARS]) for url, text in sources]
     context = ""
-    # Only scrape the top 2-3 results to keep it fast and within token limits
-    for url in urls[:3]:
-        content = scrape_url(url)
-        context += f"\n--- Source: {url} ---\n{content}\n"
+    for url, text in blocks:
+        context += f"\n--- Source: {url} ---\n{text}\n"
     return context
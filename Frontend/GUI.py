@@ -221,18 +221,23 @@ class JarvisAIApp:
                 self.update_status("SYNCING KERNEL")
                 self.log_telemetry("Accessing kernel arrays...")
                 
-                global ChatBot, FirstLayerDMM, get_system_stats, start_scheduler, add_task
-                from Backend.Chatbot import ChatBot
+                global ChatBotStream, FirstLayerDMM, get_system_stats, start_scheduler, add_task, add_reminder, connectivity
+                from Backend.Chatbot import ChatBotStream
+                from Backend.Connectivity import connectivity
                 from Backend.Model import FirstLayerDMM
                 from Backend.SystemHealth import get_system_stats
-                from Backend.Scheduler import start_scheduler, add_task
+                from Backend.Scheduler import start_scheduler, add_task, add_reminder
                 
                 start_scheduler(lambda t: self.chat_widget.add_complete_message("system", f"⏰ REMINDER: {t}"))
                 self.log_telemetry("Temporal scheduler online.")
 
-                global SpeechRecognition, QueryModifier, UniversalTranslator, text_to_speech
+                # Embedding model loads in the background; recall uses keywords until it is ready
+                from Backend.Memory import preload_memory
+                preload_memory()
+
+                global SpeechRecognition, QueryModifier, UniversalTranslator, text_to_speech, SpeechPipeline, stop_speaking
                 from Backend.SpeechToText import SpeechRecognition, QueryModifier, UniversalTranslator
-                from Backend.TextToSpeech import text_to_speech
+                from Backend.TextToSpeech import text_to_speech, SpeechPipeline, stop_speaking
 
                 self.backend_loaded = True
                 self.update_status("STABLE")
@@ -271,8 +276,8 @@ class JarvisAIApp:
                     from Backend.CodeInterpreter import dynamic_agent
                     globals()["dynamic_agent"] = dynamic_agent
                 elif pack_name == "research":
-                    from Backend.RealtimeSearchEngine import RealtimeSearchEngine
-                    globals()["RealtimeSearchEngine"] = RealtimeSearchEngine
+                    from Backend.RealtimeSearchEngine import RealtimeSearchEngineStream
+                    globals()["RealtimeSearchEngineStream"] = RealtimeSearchEngineStream
                 elif pack_name == "art":
                     from Backend.ImageGeneration import GenerateImages
                     globals()["GenerateImages"] = GenerateImages
@@ -348,6 +353,7 @@ class JarvisAIApp:
                 self.cpu_card.configure(text=stats['CPU'])
                 self.ram_card.configure(text=stats['RAM'])
                 self.bat_card.configure(text=stats['Battery'])
+                self.net_card.configure(text="ACTIVE" if connectivity.is_online() else "OFFLINE")
             except: pass
         self.root.after(3000, self.update_stats_loop)
 
@@ -366,10 +372,14 @@ class JarvisAIApp:
     def process_query_task(self, query):
         if not self.backend_loaded: return
         self.root.after(0, self.typing_indicator.show)
+        # Barge-in: a new directive silences whatever is still being spoken
+        if "stop_speaking" in globals():
+            stop_speaking()
         
         try:
             commands = FirstLayerDMM(query)
             responses = []
+            speak = "SpeechPipeline" in globals()
             
             for cmd in commands:
                 self.log_telemetry(f"Executing: {cmd}")
@@ -377,14 +387,13 @@ class JarvisAIApp:
                     self.root.after(0, self.on_closing)
                     return
                 elif cmd.startswith("general "):
-                    res = ChatBot(cmd.removeprefix("general "))
-                    self.stream_response(res)
-                    responses.append(res)
+                    # Spoken sentence by sentence while it streams, so not added to responses
+                    self.stream_response(ChatBotStream(cmd.removeprefix("general ")),
+                                         SpeechPipeline() if speak else None)
                 elif cmd.startswith("realtime "):
                     if self.ensure_expansion("research"):
-                        res = RealtimeSearchEngine(cmd.removeprefix("realtime "))
-                        self.stream_response(res)
-                        responses.append(res)
+                        self.stream_response(globals()["RealtimeSearchEngineStream"](cmd.removeprefix("realtime ")),
+                                             SpeechPipeline() if speak else None)
                 elif cmd.startswith("vision "):
                     if self.ensure_expansion("vision"):
                         # Use global analyze_screen
@@ -400,12 +409,16 @@ class JarvisAIApp:
                     if self.ensure_expansion("art"):
                         globals()["GenerateImages"](cmd.removeprefix("generate image "))
                         self.chat_widget.add_complete_message("assistant", "SYNTHESIZED ART RENDERED SUCCESSFULLY.")
+                elif cmd.startswith("reminder "):
+                    res = add_reminder(cmd.removeprefix("reminder "))
+                    self.chat_widget.add_complete_message("system", f"⏰ {res}")
+                    responses.append(res)
                 elif cmd.startswith(("open ", "close ", "play ", "system ", "google search ")):
                     if self.ensure_expansion("automation"):
                         asyncio.run(globals()["Automation"]([cmd]))
                         self.chat_widget.add_complete_message("system", f"AUTOMATION SUCCESS: {cmd}")
             
-            if responses and "text_to_speech" in globals():
+            if responses and speak:
                 threading.Thread(target=globals()["text_to_speech"], args=("\n".join(responses),), daemon=True).start()
             
             self.root.after(0, self.typing_indicator.hide)
@@ -415,19 +428,43 @@ class JarvisAIApp:
             self.chat_widget.add_complete_message("error", f"Neural Execution Error: {e}")
             self.root.after(0, self.typing_indicator.hide)
 
-    def stream_response(self, text):
-        self.root.after(0, lambda: self.chat_widget.start_streaming("assistant"))
-        words = text.split()
-        for word in words:
-            self.root.after(0, lambda w=word: self.chat_widget.add_text(w + " ", 0.02))
-            time.sleep(0.02)
-        self.root.after(0, self.chat_widget.finish_streaming)
+    def stream_response(self, chunks, speech=None):
+        """Pushes text deltas into the chat widget through the Tk event queue as they arrive.
+
+        Accepts a generator of deltas or a finished string; returns the full text.
+        If a SpeechPipeline is given, the deltas are spoken as sentences complete.
+        """
+        if isinstance(chunks, str):
+            chunks = [chunks]
+        started = False
+        parts = []
+        try:
+            for delta in chunks:
+                if not started:
+                    # Open the bubble on the first token so the typing indicator covers the wait
+                    self.root.after(0, self.typing_indicator.hide)
+                    self.root.after(0, lambda: self.chat_widget.start_streaming("assistant"))
+                    started = True
+                parts.append(delta)
+                self.root.after(0, lambda d=delta: self.chat_widget.add_text(d, 0))
+                if speech:
+                    speech.feed(delta)
+        finally:
+            if speech:
+                speech.close()
+            if started:
+                self.root.after(0, self.chat_widget.finish_streaming)
+        return "".join(parts).strip()
 
     def toggle_microphone(self):
         if not self.is_mic_on:
             self.is_mic_on = True
             self.mic_prime.configure(fg_color="#ff004c", text="🛑")
             self.log_telemetry("Microphone array active. Listening...")
+            if self.backend_loaded:
+                # A command is coming; have the speech model ready for it
+                from Backend.STTEngine import get_stt_engine
+                get_stt_engine().preload()
             # Use self.waveform
         else:
             self.is_mic_on = False
@@ -440,17 +477,22 @@ class JarvisAIApp:
                 time.sleep(1)
                 continue
             try:
-                # Use global SpeechRecognition
-                from Backend.SpeechToText import SpeechRecognition
+                from Backend.SpeechToText import SpeechRecognition, WaitForWakeWord
+                if not self.is_mic_on:
+                    # Cheap keyword spotting; Whisper only runs once the wake word is heard.
+                    # Returns early when the mic button is clicked or the app closes.
+                    if WaitForWakeWord(self.wake_word, lambda: self.is_mic_on or self.stop_speech_event.is_set()):
+                        # Wait for the UI thread to flip the mic so the command is not read as a wake attempt
+                        toggled = threading.Event()
+                        self.root.after(0, lambda: (self.is_mic_on or self.toggle_microphone(), toggled.set()))
+                        toggled.wait(1)
+                    continue
                 text = SpeechRecognition()
                 if text and not text.startswith("[") and text.strip():
-                    if not self.is_mic_on and self.wake_word in text.lower():
-                        self.root.after(0, self.toggle_microphone)
-                    elif self.is_mic_on:
-                        from Backend.SpeechToText import UniversalTranslator
-                        if UniversalTranslator: text = UniversalTranslator(text)
-                        self.root.after(0, lambda t=text: self.handle_voice_input(t))
-                        self.root.after(2000, self.toggle_microphone)
+                    from Backend.SpeechToText import UniversalTranslator
+                    if UniversalTranslator: text = UniversalTranslator(text)
+                    self.root.after(0, lambda t=text: self.handle_voice_input(t))
+                    self.root.after(2000, self.toggle_microphone)
             except: pass
             time.sleep(0.1)
 
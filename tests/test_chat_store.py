@@ -0,0 +1,39 @@
+import time
+import threading
+
+from Backend.ChatStore import ChatStore
+from Backend.MemoryIndex import MemoryIndex
+
+PAIRS_PER_THREAD = 200
+
+def test_concurrent_appends_reach_the_index_in_order(tmp_path):
+    store = ChatStore(str(tmp_path / "ChatLog.jsonl"), str(tmp_path / "ChatLog.json"))
+    index = MemoryIndex(store, str(tmp_path / "MemoryIndex.pkl"))
+    seen = []
+
+    def slow_listener(record):
+        time.sleep(0.0005)  # Widens the window in which the other writer can overtake
+        seen.append(record["id"])
+
+    store.add_listener(slow_listener)
+    start = threading.Barrier(2)
+
+    def writer(name):
+        start.wait()
+        for i in range(PAIRS_PER_THREAD):
+            store.append_many([{"role": "user", "content": f"{name}{i} question"},
+                               {"role": "assistant", "content": f"{name}{i} answer"}])
+
+    threads = [threading.Thread(target=writer, args=(name,)) for name in ("alpha", "beta")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store) == 4 * PAIRS_PER_THREAD
+    assert seen == list(range(4 * PAIRS_PER_THREAD))
+    for name in ("alpha", "beta"):
+        for i in (0, PAIRS_PER_THREAD // 2, PAIRS_PER_THREAD - 1):
+            pairs = index.search_pairs(f"{name}{i}", k=1)
+            assert pairs and pairs[0]["user"] == f"{name}{i} question"
+            assert pairs[0]["assistant"] == f"{name}{i} answer"
@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+
+from Backend.TimeParser import parse_reminder, ReminderParseError
+
+# Sunday 18 October 2026, mid-afternoon
+NOW = datetime.datetime(2026, 10, 18, 15, 30)
+
+def at(day, hour, minute=0):
+    return datetime.datetime(2026, 10, day, hour, minute)
+
+@pytest.mark.parametrize("text, message, due", [
+    ("remind me tomorrow at 9pm to call john", "call john", at(19, 21)),
+    ("remind me tomorrow to submit the report", "submit the report", at(19, 9)),
+    ("remind me today at 5pm to stretch", "stretch", at(18, 17)),
+    ("remind me tonight", "Reminder", at(18, 20)),
+    ("remind me tonight to sun the plants", "sun the plants", at(18, 20)),
+    ("remind me to order food tonight", "order food", at(18, 20)),
+])
+def test_today_tomorrow_tonight(text, message, due):
+    assert parse_reminder(text, NOW) == (message, due, None)
+
+@pytest.mark.parametrize("text, message, due", [
+    ("remind me at 9 30 to take a break", "take a break", at(19, 9, 30)),
+    ("remind me to call mom at 18 05", "call mom", at(18, 18, 5)),
+    ("remind me at 7 to walk the dog", "walk the dog", at(19, 7)),
+])
+def test_bare_at_hour_minute(text, message, due):
+    assert parse_reminder(text, NOW) == (message, due, None)
+
+def test_dotted_am_pm():
+    assert parse_reminder("remind me at 2.30pm to call the bank", NOW) == ("call the bank", at(19, 14, 30), None)
+
+def test_router_example():
+    message, due, rule = parse_reminder("9:00pm 25th june business meeting", NOW)
+    assert (message, due, rule) == ("business meeting", datetime.datetime(2027, 6, 25, 21, 0), None)
+
+def test_relative_keeps_subsecond_precision():
+    now = NOW.replace(microsecond=500000)
+    assert parse_reminder("in 1 seconds ping", now)[1] == now + datetime.timedelta(seconds=1)
+
+def test_every_other_week():
+    message, due, rule = parse_reminder("every other week team sync", NOW)
+    assert message == "team sync"
+    assert rule["every"] == 2 and rule["unit"] == "week"
+
+def test_weekly_rule():
+    message, due, rule = parse_reminder("every monday and thursday at 7am gym", NOW)
+    assert (message, due) == ("gym", at(19, 7))
+    assert rule == {"kind": "weekly", "days": [0, 3], "at": "07:00"}
+
+def test_no_time_raises():
+    with pytest.raises(ReminderParseError):
+        parse_reminder("remind me to buy milk", NOW)